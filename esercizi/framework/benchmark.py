@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del framework dati (soluzioneFram.py)
+==============================================
+
+Genera dataset sintetici riproducibili (seed fisso) e misura, per ogni dimensione,
+filter, map, reduce, group_by, le aggregazioni numeriche e gli export JSON/CSV:
+tempo (migliore di `--repeat` esecuzioni), throughput in righe/s e picco di memoria
+allocata durante l'operazione (tracemalloc, misurato in una passata separata per non
+falsare i tempi).
+
+Uso
+---
+    python benchmark.py                              # 10k e 1M righe
+    python benchmark.py --sizes 10k,1m,10m --repeat 5
+    python benchmark.py --save baseline.json         # salva i risultati come riferimento
+    python benchmark.py --compare baseline.json      # exit code 1 se tempo o memoria peggiorano oltre --tolerance
+
+Il confronto usa solo le coppie (dimensione, operazione) presenti in entrambi i file, e il
+picco di memoria solo se misurato in entrambi.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Dict, Any, Optional
+import argparse, gc, json, os, platform, random, sys, tempfile, time, tracemalloc
+
+from soluzioneFram import ExportableDataSet
+
+_SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+_CITIES = ["Rome", "Milan", "Turin", "Naples", "Bologna", "Florence", "Genoa", "Bari"]
+
+
+# ======================
+#    DATI SINTETICI
+# ======================
+
+def make_rows(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """n record con la stessa forma di _SAMPLE (name, age, city, salary)."""
+    rng = random.Random(seed)
+    return [{"name": f"user{i}", "age": rng.randint(18, 70), "city": rng.choice(_CITIES),
+             "salary": round(rng.uniform(1500.0, 6000.0), 2)} for i in range(n)]
+
+
+# ======================
+#      OPERAZIONI
+# ======================
+
+def _operations(ds: ExportableDataSet, tmpdir: str) -> Dict[str, Callable[[], Any]]:
+    json_path = os.path.join(tmpdir, "bench.json")
+    csv_path = os.path.join(tmpdir, "bench.csv")
+    return {
+        "filter": lambda: ds.filter(lambda r: r["age"] >= 30),
+        "map": lambda: ds.map(lambda r: {**r, "salary": r["salary"] * 1.1}),
+        "reduce": lambda: ds.reduce(lambda acc, r: acc + r["salary"], 0.0),
+        "group_by": lambda: dict(ds.group_by("city")),
+        "group_by.agg": lambda: ds.group_by("city").agg(salary="mean", n="count"),
+        "sum": lambda: ds.sum("salary"),
+        "mean": lambda: ds.mean("salary"),
+        "min": lambda: ds.min("age"),
+        "max": lambda: ds.max("age"),
+        "agg": lambda: ds.agg(salary=["sum", "mean", "min", "max", "std"], age=["mean"]),
+        "export_json": lambda: ds.export_json(json_path),
+        "export_csv": lambda: ds.export_csv(csv_path),
+    }
+
+
+def _time_best(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_memory(fn: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes: List[str], repeat: int = 3, memory: bool = True, seed: int = 42,
+        only: Optional[List[str]] = None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for label in sizes:
+        n = _SIZES[label]
+        print(f"\n== {label} righe ({n:,}) ==")
+        ds = ExportableDataSet(make_rows(n, seed))
+        results[label] = {}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, fn in _operations(ds, tmpdir).items():
+                if only and name not in only:
+                    continue
+                seconds = _time_best(fn, repeat)
+                entry = {"seconds": seconds, "rows_per_sec": n / seconds if seconds else float("inf")}
+                if memory:
+                    entry["peak_bytes"] = _peak_memory(fn)
+                results[label][name] = entry
+                print(_format_entry(name, entry))
+        del ds
+    return {"python": platform.python_version(), "machine": platform.machine(), "seed": seed,
+            "repeat": repeat, "results": results}
+
+
+def _format_entry(name: str, entry: Dict[str, float]) -> str:
+    line = f"  {name:<14} {entry['seconds'] * 1000:10.2f} ms  {entry['rows_per_sec']:>14,.0f} righe/s"
+    if "peak_bytes" in entry:
+        line += f"  picco {entry['peak_bytes'] / 1e6:9.2f} MB"
+    return line
+
+
+# ======================
+#   CONFRONTO BASELINE
+# ======================
+
+_METRICS = {"seconds": "tempo", "peak_bytes": "memoria"}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Elenco delle regressioni: tempi o picchi di memoria oltre baseline * (1 + tolerance)."""
+    regressions = []
+    print(f"\nConfronto con la baseline (tolleranza {tolerance:.0%}):")
+    for label, ops in current["results"].items():
+        for name, entry in ops.items():
+            ref = baseline.get("results", {}).get(label, {}).get(name)
+            if ref is None:
+                continue
+            cells, flag = [], "ok"
+            for metric, what in _METRICS.items():
+                if metric not in entry or metric not in ref:
+                    continue
+                ratio = entry[metric] / ref[metric] if ref[metric] else 1.0
+                cells.append(f"{what} {ratio:6.2f}x")
+                if ratio > 1 + tolerance:
+                    flag = "REGRESSIONE"
+                    regressions.append(f"{label}/{name}: {what} {ratio:.2f}x rispetto alla baseline")
+            print(f"  {label:>4} {name:<14} {'  '.join(cells)}  {flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del framework dati")
+    parser.add_argument("--sizes", default="10k,1m", help=f"dimensioni separate da virgola ({', '.join(_SIZES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="esecuzioni per operazione (conta la migliore)")
+    parser.add_argument("--ops", default=None, help="solo queste operazioni, separate da virgola")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="non misurare il picco di memoria")
+    parser.add_argument("--save", metavar="PATH", help="salva i risultati in JSON (nuova baseline)")
+    parser.add_argument("--compare", metavar="PATH", help="confronta con una baseline salvata")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="rallentamento ammesso (0.10 = +10%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in _SIZES]
+    if unknown:
+        parser.error(f"dimensioni sconosciute: {', '.join(unknown)}")
+    if args.repeat <= 0:
+        parser.error("--repeat deve essere positivo")
+    only = [o.strip() for o in args.ops.split(",")] if args.ops else None
+
+    current = run(sizes, repeat=args.repeat, memory=not args.no_memory, seed=args.seed, only=only)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nRisultati salvati in {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print("\n⚠️ Regressioni:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\n✅ Nessuna regressione rispetto alla baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
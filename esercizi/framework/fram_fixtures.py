@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Dati e helper condivisi dai moduli test_*.py di soluzioneFram.py.
+
+Esecuzione di tutti i test:
+    python -m unittest discover -v
+"""
+
+import os
+import tempfile
+
+from soluzioneFram import Schema
+
+_SAMPLE = [
+    {"name": "Alice", "age": 30, "city": "Rome", "salary": 3200.0},
+    {"name": "Bob",   "age": 24, "city": "Milan", "salary": 2800.0},
+    {"name": "Cecilia", "age": 24, "city": "Rome", "salary": 3000.0},
+    {"name": "Diego", "age": 41, "city": "Turin", "salary": 4100.0},
+]
+
+_SCHEMA = Schema({"name": str, "age": int, "city": str, "salary": float})
+
+
+def _sample():
+    # copia profonda a un livello: i test che modificano i record non toccano _SAMPLE
+    return [dict(r) for r in _SAMPLE]
+
+
+def _salary_sum(acc, r):  # a livello di modulo: picklable per il backend "process"
+    return acc + r["salary"]
+
+
+def _is_roman(r):
+    return r["city"] == "Rome"
+
+
+class _TempDirMixin:
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir, name)
@@ -1,20 +1,1607 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-from typing import Callable, Iterator, List, Dict, Any, Union
+from typing import Callable, Iterator, List, Dict, Any, Optional, Union, Tuple
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from types import MappingProxyType
 from functools import reduce as _py_reduce
-import json, csv, os
+from itertools import compress, chain, islice, accumulate, repeat, tee
+from dataclasses import dataclass
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import json, csv, os, math, re, gzip, time, mmap, struct, sys, pickle, operator, heapq, tempfile
+import hashlib, random, functools, threading, tracemalloc
+
+try:  # NumPy è opzionale: se presente accelera le aggregazioni colonnari
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
+
+
+# ======================
+#  AGGREGAZIONI (1 passata)
+# ======================
+
+_BASIC_AGGS = ("count", "sum", "mean", "min", "max", "var", "std")
+
+
+def _parse_quantile(name: str) -> float:
+    """'median' -> 0.5, 'p90' -> 0.9; ValueError per nomi sconosciuti."""
+    if name == "median":
+        return 0.5
+    if name.startswith("p"):
+        try:
+            q = float(name[1:]) / 100
+        except ValueError:
+            q = -1.0
+        if 0.0 <= q <= 1.0:
+            return q
+    raise ValueError(f"Aggregazione sconosciuta: {name}")
+
+
+class _Accumulator:
+    """
+    Statistiche di un campo calcolate in streaming: count, sum, mean, min, max,
+    var/std (Welford, campionarie) e quantili esatti ('median', 'pNN').
+
+    Memoria costante, tranne quando sono richiesti quantili: in quel caso i valori
+    del campo vengono conservati per ordinarli alla fine. Se l'unica statistica è
+    "count" si contano i valori non nulli, di qualsiasi tipo.
+    """
+
+    __slots__ = ("aggs", "n", "total", "lo", "hi", "_mean", "_m2", "values")
+
+    def __init__(self, aggs: List[str]):
+        for a in aggs:
+            if a not in _BASIC_AGGS:
+                _parse_quantile(a)
+        self.aggs = list(aggs)
+        self.n = 0
+        self.total = 0.0
+        self.lo = math.inf
+        self.hi = -math.inf
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.values = [] if any(a not in _BASIC_AGGS for a in aggs) else None
+
+    @classmethod
+    def from_values(cls, aggs: List[str], values) -> '_Accumulator':
+        """
+        Accumulatore riempito in blocco da una sequenza (lista o colonna tipizzata):
+        la validazione e sum/min/max sono builtin, quindi cicli in C invece di un
+        aggiornamento Python per ogni valore.
+        """
+        acc = cls(aggs)
+        typed = _typecode(values) is not None
+        if acc.count_only():
+            acc.n = len(values) if typed else len(values) - values.count(None)
+            return acc
+        if not typed and not all(map(isinstance, values, repeat((int, float)))):
+            bad = next(v for v in values if not isinstance(v, (int, float)))
+            raise TypeError(f"Valore non numerico trovato: {bad}")
+        acc.n = len(values)
+        if not acc.n:
+            return acc
+        if typed and _np is not None:
+            # colonna tipizzata: le stesse statistiche calcolate da NumPy
+            arr = _np.frombuffer(values, dtype=_typecode(values)).astype(float)
+            acc.total = float(arr.sum())
+            acc.lo, acc.hi = float(arr.min()), float(arr.max())
+            acc._mean = acc.total / acc.n
+            acc._m2 = float(((arr - acc._mean) ** 2).sum())
+            if acc.values is not None:
+                acc.values = arr.tolist()
+            return acc
+        acc.total = float(sum(values, 0.0))
+        acc._mean = acc.total / acc.n
+        if "min" in acc.aggs:
+            acc.lo = float(min(values))
+        if "max" in acc.aggs:
+            acc.hi = float(max(values))
+        if "var" in acc.aggs or "std" in acc.aggs:
+            mean = acc._mean
+            acc._m2 = math.fsum((v - mean) * (v - mean) for v in values)
+        if acc.values is not None:
+            acc.values = [float(v) for v in values]
+        return acc
+
+    def count_only(self) -> bool:
+        return self.aggs == ["count"]
+
+    def add(self, v: float) -> None:
+        self.n += 1
+        self.total += v
+        if v < self.lo:
+            self.lo = v
+        if v > self.hi:
+            self.hi = v
+        delta = v - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (v - self._mean)
+        if self.values is not None:
+            self.values.append(v)
+
+    def merge(self, other: '_Accumulator') -> None:
+        """Unisce un accumulatore calcolato su un'altra porzione dei dati (formula di Chan)."""
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.n * other.n / n
+        self._mean += delta * other.n / n
+        self.n = n
+        self.total += other.total
+        self.lo = min(self.lo, other.lo)
+        self.hi = max(self.hi, other.hi)
+        if self.values is not None:
+            self.values.extend(other.values)
+
+    def _quantile(self, sorted_vals: List[float], q: float) -> float:
+        pos = (len(sorted_vals) - 1) * q
+        i = int(pos)
+        if i + 1 >= len(sorted_vals):
+            return sorted_vals[i]
+        return sorted_vals[i] + (sorted_vals[i + 1] - sorted_vals[i]) * (pos - i)
+
+    def result(self, agg: str) -> float:
+        if agg == "count":
+            return self.n
+        if agg == "sum":
+            return self.total
+        if not self.n:
+            raise ValueError("Dataset vuoto")
+        if agg == "mean":
+            return self.total / self.n
+        if agg == "min":
+            return self.lo
+        if agg == "max":
+            return self.hi
+        if agg in ("var", "std"):
+            if self.n < 2:
+                raise ValueError("Servono almeno due valori per varianza/deviazione standard")
+            var = self._m2 / (self.n - 1)
+            return var if agg == "var" else math.sqrt(var)
+        if not isinstance(self.values, list) or len(self.values) != self.n:
+            raise ValueError(f"Quantile {agg} non disponibile")
+        self.values.sort()
+        return self._quantile(self.values, _parse_quantile(agg))
+
+    def results(self) -> Dict[str, float]:
+        return {a: self.result(a) for a in self.aggs}
+
+
+def _make_accumulators(specs: Dict[str, Union[str, List[str]]]) -> Dict[str, _Accumulator]:
+    if not specs:
+        raise ValueError("Specificare almeno un campo da aggregare")
+    return {f: _Accumulator([aggs] if isinstance(aggs, str) else list(aggs)) for f, aggs in specs.items()}
+
+
+def _accumulate_rows(rows, accs: Dict[str, _Accumulator]) -> None:
+    items = list(accs.items())
+    for r in rows:
+        for field, acc in items:
+            if field not in r:
+                raise ValueError(f"Campo {field} mancante in un record")
+            v = r[field]
+            if acc.count_only():
+                if v is not None:
+                    acc.n += 1
+                continue
+            if not isinstance(v, (int, float)):
+                raise TypeError(f"Valore non numerico trovato: {v}")
+            acc.add(float(v))
+
+
+class AggregationMixin:
+    """
+    agg() in una sola passata + sum/mean/min/max/..., che calcolano una sola statistica
+    con i builtin sulla serie del campo (_field_values).
+    Le classi che lo usano devono essere iterabili sui record (o ridefinire _accumulate e _field_values).
+    """
+
+    def _accumulate(self, accs: Dict[str, _Accumulator]) -> None:
+        _accumulate_rows(iter(self), accs)
+
+    def _cached(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        # punto di aggancio per ResultCacheMixin: di default nessuna cache
+        return compute()
+
+    def agg(self, /, **specs: Union[str, List[str]]) -> Dict[str, Dict[str, float]]:
+        """
+        Calcola più aggregazioni su più campi con una sola scansione.
+
+        Esempio:
+            ds.agg(salary=["sum", "mean", "min", "max"], age=["mean", "p90"])
+            -> {"salary": {"sum": ..., ...}, "age": {"mean": ..., "p90": ...}}
+        """
+        def compute():
+            accs = _make_accumulators(specs)
+            self._accumulate(accs)
+            return {f: acc.results() for f, acc in accs.items()}
+        result = self._cached(("agg", _freeze(specs)), compute)
+        return {f: dict(v) for f, v in result.items()}  # copia: il risultato in cache non va alterato
+
+    def _field_values(self, field: str) -> List[Any]:
+        return [_field_value(r, field) for r in self]
+
+    def _agg_one(self, field: str, agg: str) -> float:
+        def compute():
+            # una sola statistica: builtin sulla serie del campo, niente accumulo valore per valore
+            return _Accumulator.from_values([agg], self._field_values(field)).result(agg)
+        return self._cached(("agg", field, agg), compute)
+
+    def sum(self, field: str) -> float:
+        return self._agg_one(field, "sum")
+
+    def mean(self, field: str) -> float:
+        return self._agg_one(field, "mean")
+
+    def min(self, field: str) -> float:
+        return self._agg_one(field, "min")
+
+    def max(self, field: str) -> float:
+        return self._agg_one(field, "max")
+
+    def var(self, field: str) -> float:
+        return self._agg_one(field, "var")
+
+    def std(self, field: str) -> float:
+        return self._agg_one(field, "std")
+
+    def quantile(self, field: str, q: float) -> float:
+        return self._agg_one(field, f"p{q * 100}")
+
+    # ---------- Aggregati approssimati (sketch) ----------
+    def _iter_field(self, field: str) -> Iterator[Any]:
+        for r in self:
+            yield _field_value(r, field)
+
+    def sketch(self, field: str, kind: str, **params: Any):
+        """
+        Sketch del campo: "hll" (HyperLogLog), "kll" (quantili) o "cms" (Count-Min).
+        Gli sketch di blocchi/partizioni diverse si combinano con merge().
+        """
+        if kind not in _SKETCHES:
+            raise ValueError(f"Sketch sconosciuto: {kind} (ammessi: {', '.join(_SKETCHES)})")
+        sk = _SKETCHES[kind](**params)
+        for v in self._iter_field(field):
+            sk.add(v)
+        return sk
+
+    def approx_distinct(self, field: str, precision: int = 12) -> int:
+        return self.sketch(field, "hll", precision=precision).count()
+
+    def approx_quantiles(self, field: str, qs: List[float] = (0.25, 0.5, 0.75), k: int = 200) -> List[float]:
+        sk = self.sketch(field, "kll", k=k)
+        return [sk.quantile(q) for q in qs]
+
+    def approx_top_items(self, field: str, n: int = 10, width: int = 2048, depth: int = 5) -> List[Tuple[Any, int]]:
+        return self.sketch(field, "cms", width=width, depth=depth, capacity=max(n * 10, 100)).top(n)
+
+    def _keyed_columns(self, key_or_fn, fields: List[str]) -> Tuple[Iterator[Any], List[Iterator[Any]]]:
+        """Chiavi e valori dei campi richiesti, come iteratori paralleli: usato da GroupBy.agg."""
+        return _keyed_rows(self, key_or_fn, fields)
+
+    def _group_agg(self, key_or_fn, named: Dict[str, Any]):
+        state = _GroupAggregator(key_or_fn, named)
+        state.extend(*self._keyed_columns(key_or_fn, state.fields))
+        return state.rows()
+
+
+# ======================
+#   SKETCH (APPROSSIMATI)
+# ======================
+
+def _hash_bytes(value: Any) -> bytes:
+    """Byte da cui calcolare l'hash: valori uguali per Python (1 == 1.0 == True) danno gli stessi byte."""
+    if isinstance(value, bool) or (isinstance(value, float) and value.is_integer()):
+        value = int(value)
+    return repr(value).encode("utf-8")
+
+
+def _hash64(value: Any, salt: bytes = b"") -> int:
+    # hash stabile tra processi (hash() di Python è randomizzato): serve per fare merge
+    return int.from_bytes(hashlib.blake2b(_hash_bytes(value), digest_size=8, salt=salt).digest(), "big")
+
+
+class HyperLogLog:
+    """Conteggio approssimato dei valori distinti: 2**precision registri, errore ~1.04/sqrt(2**precision)."""
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision deve essere tra 4 e 18")
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, value: Any) -> None:
+        h = _hash64(value)
+        idx = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.p != self.p:
+            raise ValueError("Impossibile unire HyperLogLog con precisione diversa")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)  # correzione per cardinalità piccole
+        return int(round(estimate))
+
+
+class KLLSketch:
+    """
+    Quantili approssimati (compattatori in stile KLL): ogni livello tiene al più k valori;
+    quando si riempie, metà dei valori (uno sì e uno no, dopo l'ordinamento) sale al
+    livello successivo con peso doppio. Memoria O(k log(n/k)).
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        if k < 2:
+            raise ValueError("k deve essere almeno 2")
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    def add(self, value: Any) -> None:
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"Valore non numerico trovato: {value}")
+        self.n += 1
+        self.levels[0].append(float(value))
+        if len(self.levels[0]) >= self.k:
+            self._compress()
+
+    def _compress(self) -> None:
+        for h in range(len(self.levels)):
+            if len(self.levels[h]) >= self.k:
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                items = sorted(self.levels[h])
+                self.levels[h + 1].extend(items[self._rng.randint(0, 1)::2])
+                self.levels[h] = []
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q deve essere tra 0 e 1")
+        weighted = sorted((v, 1 << h) for h, items in enumerate(self.levels) for v in items)
+        if not weighted:
+            raise ValueError("Dataset vuoto")
+        total = sum(w for _, w in weighted)
+        target = q * total
+        cum = 0
+        for v, w in weighted:
+            cum += w
+            if cum >= target:
+                return v
+        return weighted[-1][0]
+
+
+class CountMinSketch:
+    """
+    Frequenze approssimate (mai sottostimate) in width*depth contatori, più una lista
+    dei `capacity` candidati più frequenti per rispondere a top(n).
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 5, capacity: int = 100):
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.table = [array("q", bytes(8 * width)) for _ in range(depth)]
+        self.candidates: Dict[Any, int] = {}
+
+    def _cells(self, value: Any) -> List[int]:
+        digest = hashlib.blake2b(_hash_bytes(value), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[4 * i:4 * i + 4], "big") % self.width for i in range(self.depth)]
+
+    def add(self, value: Any, count: int = 1) -> None:
+        est = None
+        for row, cell in zip(self.table, self._cells(value)):
+            row[cell] += count
+            est = row[cell] if est is None else min(est, row[cell])
+        self._track(value, est)
+
+    def _track(self, value: Any, est: int) -> None:
+        if value in self.candidates or len(self.candidates) < self.capacity:
+            self.candidates[value] = est
+            return
+        weakest = min(self.candidates, key=self.candidates.__getitem__)
+        if est > self.candidates[weakest]:
+            del self.candidates[weakest]
+            self.candidates[value] = est
+
+    def estimate(self, value: Any) -> int:
+        return min(row[cell] for row, cell in zip(self.table, self._cells(value)))
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Impossibile unire Count-Min con dimensioni diverse")
+        for row, orow in zip(self.table, other.table):
+            for i, c in enumerate(orow):
+                if c:
+                    row[i] += c
+        values = set(self.candidates) | set(other.candidates)
+        ranked = sorted(values, key=self.estimate, reverse=True)[:self.capacity]
+        self.candidates = {v: self.estimate(v) for v in ranked}
+        return self
+
+    def top(self, n: int = 10) -> List[Tuple[Any, int]]:
+        return sorted(((v, self.estimate(v)) for v in self.candidates), key=lambda t: t[1], reverse=True)[:n]
+
+
+_SKETCHES = {"hll": HyperLogLog, "kll": KLLSketch, "cms": CountMinSketch}
+
+
+# ======================
+#     RAGGRUPPAMENTI
+# ======================
+
+GroupKey = Union[str, Tuple[str, ...], Callable[[Dict[str, Any]], Any]]
+
+
+def _key_function(key_or_fn: GroupKey) -> Callable[[Dict[str, Any]], Any]:
+    """Nome di campo, tupla di nomi (chiave composta) o funzione -> funzione record -> chiave."""
+    if callable(key_or_fn):
+        return key_or_fn
+    fields = (key_or_fn,) if isinstance(key_or_fn, str) else tuple(key_or_fn)
+
+    def key_fn(r: Dict[str, Any]) -> Any:
+        for f in fields:
+            if f not in r:
+                raise ValueError(f"Campo {f} mancante")
+        return r[fields[0]] if isinstance(key_or_fn, str) else tuple(r[f] for f in fields)
+    return key_fn
+
+
+def _key_getter(key_or_fn: GroupKey) -> Callable[[Dict[str, Any]], Any]:
+    """Come _key_function, ma con operator.itemgetter (in C): un campo mancante solleva KeyError."""
+    if callable(key_or_fn):
+        return key_or_fn
+    if isinstance(key_or_fn, str):
+        return operator.itemgetter(key_or_fn)
+    fields = tuple(key_or_fn)
+    if len(fields) == 1:
+        return lambda r: (r[fields[0]],)
+    return operator.itemgetter(*fields)
+
+
+def _keyed_rows(rows, key_or_fn: GroupKey, fields: List[str]) -> Tuple[Iterator[Any], List[Iterator[Any]]]:
+    """Chiavi e valori dei campi richiesti come iteratori paralleli sui record (per _GroupAggregator)."""
+    if isinstance(rows, list):
+        sources = [rows] * (len(fields) + 1)
+    else:  # sorgente a passata singola (piano pigro): tee la legge una volta sola
+        sources = tee(rows, len(fields) + 1)
+    keys = map(_key_getter(key_or_fn), sources[0])
+    return keys, [map(operator.itemgetter(f), src) for f, src in zip(fields, sources[1:])]
+
+
+class _GroupAggregator:
+    """
+    Stato di GroupBy.agg: conteggi e accumulatori per gruppo. extend() raccoglie i valori
+    per gruppo con un ciclo piatto e li riduce con _Accumulator.from_values (builtin);
+    merge() unisce lo stato di un blocco successivo, quindi può essere mantenuto in modo incrementale.
+    """
+
+    def __init__(self, key_or_fn: GroupKey, named: Dict[str, Union[str, Tuple[str, str], List[str]]]):
+        outputs: List[Tuple[str, Any, str]] = []  # (nome output, campo o None, aggregazione)
+        for name, spec in named.items():
+            if isinstance(spec, tuple):
+                outputs.append((name, spec[0], spec[1]))
+            elif isinstance(spec, list):
+                outputs.extend((f"{name}_{a}", name, a) for a in spec)
+            elif spec == "count":
+                outputs.append((name, None, "count"))
+            else:
+                outputs.append((name, name, spec))
+        if not outputs:
+            raise ValueError("Specificare almeno un'aggregazione")
+        aggs_by_field: Dict[str, List[str]] = {}
+        for _, field, a in outputs:
+            if field is not None and a not in aggs_by_field.setdefault(field, []):
+                aggs_by_field[field].append(a)
+        for aggs in aggs_by_field.values():
+            _Accumulator(aggs)  # valida i nomi delle aggregazioni prima della scansione
+        self.key = key_or_fn
+        self.named = named
+        self.outputs = outputs
+        self.aggs_by_field = aggs_by_field
+        self.fields = list(aggs_by_field)
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts: Dict[Any, int] = {}
+        self.accs: Dict[Any, List[_Accumulator]] = {}
+
+    def extend(self, keys: Iterator[Any], columns: List[Iterator[Any]]) -> None:
+        """Aggiunge le righe date come chiavi + colonne parallele (vedi _keyed_rows)."""
+        buckets: Dict[Any, Any] = {}
+        try:
+            if not columns:  # solo conteggi
+                for k in keys:
+                    buckets[k] = buckets.get(k, 0) + 1
+            elif len(columns) == 1:
+                for k, v in zip(keys, columns[0]):
+                    b = buckets.get(k)
+                    if b is None:
+                        buckets[k] = [v]
+                    else:
+                        b.append(v)
+            else:
+                for k, *values in zip(keys, *columns):
+                    b = buckets.get(k)
+                    if b is None:
+                        b = buckets[k] = [[] for _ in values]
+                    for lst, v in zip(b, values):
+                        lst.append(v)
+        except KeyError as e:
+            raise ValueError(f"Campo {e.args[0]} mancante in un record") from None
+        for k, b in buckets.items():
+            if not columns:
+                self._merge_group(k, b, [])
+                continue
+            cols = (b,) if len(columns) == 1 else b
+            self._merge_group(k, len(cols[0]), [_Accumulator.from_values(self.aggs_by_field[f], vals)
+                                                for f, vals in zip(self.fields, cols)])
+
+    def merge(self, other: '_GroupAggregator') -> None:
+        """Unisce lo stato calcolato su altre righe con la stessa specifica."""
+        for k, group in other.accs.items():
+            self._merge_group(k, other.counts[k], group)
+
+    def _merge_group(self, k: Any, count: int, group: List[_Accumulator]) -> None:
+        mine = self.accs.get(k)
+        if mine is None:
+            self.accs[k] = group
+            self.counts[k] = count
+            return
+        self.counts[k] += count
+        for acc, part in zip(mine, group):
+            acc.merge(part)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Una riga per gruppo (chiavi + aggregati), in ordine di apparizione."""
+        composite = not callable(self.key) and not isinstance(self.key, str)
+        if callable(self.key):
+            key_names: Tuple[str, ...] = ("key",)
+        elif isinstance(self.key, str):
+            key_names = (self.key,)
+        else:
+            key_names = tuple(self.key)
+        index = {f: i for i, f in enumerate(self.fields)}
+        rows = []
+        for k, group in self.accs.items():
+            row = dict(zip(key_names, k if composite else (k,)))
+            for name, field, a in self.outputs:
+                row[name] = self.counts[k] if field is None else group[index[field]].result(a)
+            rows.append(row)
+        return rows
+
+
+class GroupBy(Mapping):
+    """
+    Risultato di group_by(): si comporta come un dict {chiave: DataSet} (i gruppi vengono
+    materializzati solo al primo accesso) ed espone agg() per calcolare le aggregazioni
+    per gruppo in un'unica passata, senza costruire le liste di record dei gruppi.
+    """
+
+    def __init__(self, source: Any, key_or_fn: GroupKey):
+        self._source = source
+        self._key = key_or_fn
+        self._groups = None
+
+    def _materialize(self) -> Dict[Any, Any]:
+        if self._groups is None:
+            # dict nuovo anche quando i gruppi arrivano dalla cache del dataset sorgente
+            self._groups = dict(self._source._cached(("group_by", _freeze(self._key)),
+                                                     lambda: self._source._group_rows(self._key)))
+        return self._groups
+
+    def __getitem__(self, key: Any):
+        return self._materialize()[key]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __repr__(self) -> str:
+        return f"GroupBy(key={self._key!r})"
+
+    def agg(self, /, **named: Union[str, Tuple[str, str], List[str]]):
+        """
+        Aggregazioni per gruppo, con nomi di output espliciti:
+
+            ds.group_by("city").agg(salary="mean", n="count")
+            ds.group_by(("city", "age")).agg(top=("salary", "max"), salary=["min", "max"])
+
+        - campo="agg"          -> colonna 'campo' con l'aggregazione sul campo omonimo
+        - nome="count"         -> numero di record del gruppo
+        - nome=(campo, "agg")  -> colonna 'nome' con l'aggregazione su 'campo'
+        - campo=["a1", "a2"]   -> colonne 'campo_a1', 'campo_a2'
+
+        Ritorna un DataSet con una riga per gruppo (chiavi + aggregati), in ordine di apparizione.
+        """
+        rows = self._source._cached(("group_by.agg", _freeze(self._key), _freeze(named)),
+                                    lambda: self._source._group_agg(self._key, named))
+        # record copiati: modificare il risultato non deve alterare quello in cache
+        return self._source._group_factory([dict(r) for r in rows])
+
+
+# ======================
+#       HASH JOIN
+# ======================
+
+_JOIN_TYPES = ("inner", "left", "outer")
+
+
+def _merge_pair(left: Dict[str, Any], right: Dict[str, Any], keyset: set, suffixes: Tuple[str, str]) -> Dict[str, Any]:
+    clash = (left.keys() & right.keys()) - keyset
+    out = {}
+    for k, v in left.items():
+        out[k + suffixes[0] if k in clash else k] = v
+    for k, v in right.items():
+        if k in keyset:
+            out.setdefault(k, v)  # per le righe solo-destra la chiave arriva da qui
+        else:
+            out[k + suffixes[1] if k in clash else k] = v
+    return out
+
+
+def _hash_join(probe, build: List[Dict[str, Any]], on, how: str, suffixes: Tuple[str, str],
+               probe_is_left: bool) -> Iterator[Dict[str, Any]]:
+    """
+    Hash join: tabella hash sul lato build (in memoria), il lato probe scorre in streaming.
+    I campi dell'altro lato mancanti (righe senza corrispondenza) valgono None.
+    """
+    if how not in _JOIN_TYPES:
+        raise ValueError(f"Tipo di join sconosciuto: {how} (ammessi: {', '.join(_JOIN_TYPES)})")
+    keyset = {on} if isinstance(on, str) else set(on)
+    key_fn = _key_function(on)
+    table: Dict[Any, List[int]] = {}
+    build_fields: Dict[str, None] = {}  # dict come insieme ordinato: colonne in ordine stabile
+    for i, r in enumerate(build):
+        table.setdefault(key_fn(r), []).append(i)
+        build_fields.update(dict.fromkeys(r))
+    build_nulls = {f: None for f in build_fields if f not in keyset}
+    keep_probe = how == "outer" or (how == "left" and probe_is_left)
+    keep_build = how == "outer" or (how == "left" and not probe_is_left)
+    matched = [False] * len(build) if keep_build else None
+    probe_fields: Dict[str, None] = {}
+
+    def pair(p: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+        return _merge_pair(p, b, keyset, suffixes) if probe_is_left else _merge_pair(b, p, keyset, suffixes)
+
+    for p in probe:
+        hits = table.get(key_fn(p))
+        if keep_build:
+            probe_fields.update(dict.fromkeys(p))
+        if hits:
+            for i in hits:
+                if matched is not None:
+                    matched[i] = True
+                yield pair(p, build[i])
+        elif keep_probe:
+            yield pair(p, build_nulls)
+    if keep_build:
+        probe_nulls = {f: None for f in probe_fields if f not in keyset}
+        for i, b in enumerate(build):
+            if not matched[i]:
+                yield pair(probe_nulls, b)
+
+
+# ======================
+#      ESPRESSIONI
+# ======================
+
+_CMP_OPS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+            "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def _to_bool_vector(v):
+    return v if _np is not None and isinstance(v, _np.ndarray) else list(map(bool, v))
+
+
+class Expr(ABC):
+    """
+    Espressione su campi dei record, es. (col("age") >= 30) & (col("city") == "Rome").
+
+    Si usa come predicato di filter(): può essere valutata riga per riga (è callable
+    su un record) oppure in blocco sulle colonne di un ColumnarDataSet (con NumPy,
+    se installato, per le colonne numeriche). Uguaglianze e confronti su campi
+    indicizzati vengono risolti con gli indici.
+    """
+
+    def __call__(self, r: Dict[str, Any]) -> Any:
+        return self.eval_row(r)
+
+    @abstractmethod
+    def eval_row(self, r: Dict[str, Any]) -> Any:
+        """Valore dell'espressione su un record."""
+
+    @abstractmethod
+    def eval_columns(self, columns: Mapping) -> Any:
+        """Valori dell'espressione su tutte le righe, dalle colonne {campo: colonna}."""
+
+    def _index_positions(self, ds: Any) -> Optional[set]:
+        # posizioni candidate ricavabili dagli indici di ds, None se non applicabile
+        return None
+
+    def __bool__(self):
+        raise TypeError("Usa & | ~ per combinare le espressioni (non and/or/not)")
+
+    def _compare(self, op: str, other: Any) -> 'Expr':
+        return _Compare(op, self, other if isinstance(other, Expr) else _Lit(other))
+
+    def __eq__(self, other: Any) -> 'Expr':  # type: ignore[override]
+        return self._compare("==", other)
+
+    def __ne__(self, other: Any) -> 'Expr':  # type: ignore[override]
+        return self._compare("!=", other)
+
+    def __lt__(self, other: Any) -> 'Expr':  # type: ignore[override]
+        return self._compare("<", other)
+
+    def __le__(self, other: Any) -> 'Expr':  # type: ignore[override]
+        return self._compare("<=", other)
+
+    def __gt__(self, other: Any) -> 'Expr':  # type: ignore[override]
+        return self._compare(">", other)
+
+    def __ge__(self, other: Any) -> 'Expr':  # type: ignore[override]
+        return self._compare(">=", other)
+
+    __hash__ = object.__hash__
+
+    def __and__(self, other: 'Expr') -> 'Expr':
+        return _Logical("&", self, other)
+
+    def __or__(self, other: 'Expr') -> 'Expr':
+        return _Logical("|", self, other)
+
+    def __invert__(self) -> 'Expr':
+        return _Not(self)
+
+    def isin(self, values) -> 'Expr':
+        return _IsIn(self, values)
+
+    def between(self, low: Any, high: Any) -> 'Expr':
+        return (self >= low) & (self <= high)
+
+
+class _Col(Expr):
+    def __init__(self, name: str):
+        self.name = name
+
+    def eval_row(self, r):
+        return _field_value(r, self.name)
+
+    def eval_columns(self, columns):
+        if self.name not in columns:
+            raise ValueError(f"Campo {self.name} mancante")
+        col = columns[self.name]
+        if _np is not None and _typecode(col):
+            return _np.frombuffer(col, dtype=_typecode(col))
+        return col
+
+    def __repr__(self):
+        return f"col({self.name!r})"
+
+
+class _Lit(Expr):
+    def __init__(self, value: Any):
+        self.value = value
+
+    def eval_row(self, r):
+        return self.value
+
+    def eval_columns(self, columns):
+        return self.value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class _Compare(Expr):
+    def __init__(self, op: str, left: Expr, right: Expr):
+        self.op, self.left, self.right = op, left, right
+
+    def eval_row(self, r):
+        return _CMP_OPS[self.op](self.left.eval_row(r), self.right.eval_row(r))
+
+    def eval_columns(self, columns):
+        fn = _CMP_OPS[self.op]
+        a, b = self.left.eval_columns(columns), self.right.eval_columns(columns)
+        if _np is not None and (isinstance(a, _np.ndarray) or isinstance(b, _np.ndarray)):
+            try:
+                return fn(a if not isinstance(a, list) else _np.asarray(a, dtype=object),
+                          b if not isinstance(b, list) else _np.asarray(b, dtype=object))
+            except TypeError:
+                # tipi che NumPy non sa confrontare (UFuncTypeError): il confronto per elemento
+                # solleva lo stesso TypeError del percorso per riga
+                a = a.tolist() if isinstance(a, _np.ndarray) else a
+                b = b.tolist() if isinstance(b, _np.ndarray) else b
+        if isinstance(self.right, _Lit):
+            return [fn(x, b) for x in a]
+        if isinstance(self.left, _Lit):
+            return [fn(a, y) for y in b]
+        return [fn(x, y) for x, y in zip(a, b)]
+
+    def _index_positions(self, ds):
+        if not (isinstance(self.left, _Col) and isinstance(self.right, _Lit)):
+            return None
+        ix = ds._get_index(self.left.name)
+        if ix is None:
+            return None
+        if self.op == "==":
+            return set(ix.lookup(self.right.value))
+        if isinstance(ix, _SortedIndex) and self.op in ("<", "<=", ">", ">="):
+            return set(ix.compare(self.op, self.right.value))
+        return None
+
+    def __repr__(self):
+        return f"({self.left!r} {self.op} {self.right!r})"
+
+
+class _IsIn(Expr):
+    def __init__(self, operand: Expr, values):
+        self.operand = operand
+        self.values = list(values)
+
+    def eval_row(self, r):
+        return self.operand.eval_row(r) in self.values
+
+    def eval_columns(self, columns):
+        a = self.operand.eval_columns(columns)
+        if _np is not None and isinstance(a, _np.ndarray):
+            return _np.isin(a, self.values)
+        return [x in self.values for x in a]
+
+    def _index_positions(self, ds):
+        if not isinstance(self.operand, _Col):
+            return None
+        ix = ds._get_index(self.operand.name)
+        if ix is None:
+            return None
+        return {i for v in self.values for i in ix.lookup(v)}
+
+    def __repr__(self):
+        return f"{self.operand!r}.isin({self.values!r})"
+
+
+class _Logical(Expr):
+    def __init__(self, op: str, left: Expr, right: Expr):
+        self.op, self.left, self.right = op, left, right
+
+    def eval_row(self, r):
+        if self.op == "&":
+            return bool(self.left.eval_row(r)) and bool(self.right.eval_row(r))
+        return bool(self.left.eval_row(r)) or bool(self.right.eval_row(r))
+
+    def eval_columns(self, columns):
+        a = _to_bool_vector(self.left.eval_columns(columns))
+        b = _to_bool_vector(self.right.eval_columns(columns))
+        if _np is not None and (isinstance(a, _np.ndarray) or isinstance(b, _np.ndarray)):
+            a, b = _np.asarray(a, dtype=bool), _np.asarray(b, dtype=bool)
+            return a & b if self.op == "&" else a | b
+        if self.op == "&":
+            return [x and y for x, y in zip(a, b)]
+        return [x or y for x, y in zip(a, b)]
+
+    def _index_positions(self, ds):
+        left, right = self.left._index_positions(ds), self.right._index_positions(ds)
+        if self.op == "&":
+            if left is not None and right is not None:
+                return left & right
+            return left if left is not None else right
+        if left is not None and right is not None:
+            return left | right
+        return None
+
+    def __repr__(self):
+        return f"({self.left!r} {self.op} {self.right!r})"
+
+
+class _Not(Expr):
+    def __init__(self, operand: Expr):
+        self.operand = operand
+
+    def eval_row(self, r):
+        return not self.operand.eval_row(r)
+
+    def eval_columns(self, columns):
+        a = _to_bool_vector(self.operand.eval_columns(columns))
+        if _np is not None and isinstance(a, _np.ndarray):
+            return ~a
+        return [not x for x in a]
+
+    def __repr__(self):
+        return f"~{self.operand!r}"
+
+
+def col(name: str) -> Expr:
+    """Riferimento a un campo da usare nelle espressioni di filter()."""
+    return _Col(name)
+
+
+def lit(value: Any) -> Expr:
+    return _Lit(value)
+
+
+# ======================
+#      ORDINAMENTO
+# ======================
+
+def _sort_directions(fields: tuple, descending: Union[bool, List[bool]]) -> List[bool]:
+    if not fields:
+        raise ValueError("Specificare almeno un campo di ordinamento")
+    if isinstance(descending, bool):
+        return [descending] * len(fields)
+    if len(descending) != len(fields):
+        raise ValueError("descending deve avere un valore per ogni campo")
+    return list(descending)
+
+
+class _SortKey:
+    """Chiave multi-campo con direzione per campo (per heapq.merge, che non ordina a più passate)."""
+    __slots__ = ("values", "desc")
+
+    def __init__(self, values: tuple, desc: List[bool]):
+        self.values = values
+        self.desc = desc
+
+    def __lt__(self, other: '_SortKey') -> bool:
+        for a, b, d in zip(self.values, other.values, self.desc):
+            if a != b:
+                return a > b if d else a < b
+        return False
+
+    def __eq__(self, other: object) -> bool:
+        # necessario a heapq.merge: a parità di chiave decide l'ordine dei blocchi (stabilità)
+        return isinstance(other, _SortKey) and self.values == other.values
+
+    __hash__ = None
+
+
+def _sorted_positions(ds: Any, fields: tuple, desc: List[bool]) -> List[int]:
+    # ordinamento stabile a più passate: dal campo meno significativo al più significativo
+    order = list(range(len(ds)))
+    for f, d in reversed(list(zip(fields, desc))):
+        values = ds._field_values(f)
+        order.sort(key=values.__getitem__, reverse=d)
+    return order
+
+
+def _external_sort(rows: Iterator[Dict[str, Any]], fields: tuple, desc: List[bool],
+                   run_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Merge sort esterno: blocchi da run_size record ordinati in memoria e scritti su
+    file temporanei (pickle), poi fusi in streaming con heapq.merge.
+    """
+    def key(r: Dict[str, Any]) -> _SortKey:
+        return _SortKey(tuple(_field_value(r, f) for f in fields), desc)
+
+    def read_run(f) -> Iterator[Dict[str, Any]]:
+        f.seek(0)
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+    runs = []
+    try:
+        for chunk in _chunked(rows, run_size):
+            chunk.sort(key=key)
+            if not runs and len(chunk) < run_size:
+                yield from chunk  # tutto in un blocco: niente file temporanei
+                return
+            f = tempfile.TemporaryFile()
+            pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+            for r in chunk:
+                pickler.dump(r)
+                pickler.clear_memo()
+            runs.append(f)
+        yield from heapq.merge(*(read_run(f) for f in runs), key=key)
+    finally:
+        for f in runs:
+            f.close()
+
+
+# ======================
+#   FINESTRE MOBILI
+# ======================
+
+_WINDOW_FUNCS = ("sum", "mean", "min", "max", "count")
+
+
+def _check_window_func(func: str) -> None:
+    if func not in _WINDOW_FUNCS:
+        raise ValueError(f"Funzione sconosciuta: {func} (ammesse: {', '.join(_WINDOW_FUNCS)})")
+
+
+def _rolling_values(values: List[float], window: int, func: str, min_periods: int) -> List[Optional[float]]:
+    """
+    func sulla finestra degli ultimi `window` valori, in O(n): somma mobile per
+    sum/mean, deque monotona di posizioni per min/max. None finché la finestra
+    ha meno di min_periods valori.
+    """
+    out: List[Optional[float]] = []
+    total = 0.0
+    dq: deque = deque()  # posizioni con valori monotoni (crescenti per min, decrescenti per max)
+    better = operator.le if func == "min" else operator.ge
+    for i, v in enumerate(values):
+        total += v
+        if i >= window:
+            total -= values[i - window]
+        if func in ("min", "max"):
+            while dq and better(v, values[dq[-1]]):
+                dq.pop()
+            dq.append(i)
+            if dq[0] <= i - window:
+                dq.popleft()
+        n = min(i + 1, window)
+        if n < min_periods:
+            out.append(None)
+        elif func == "sum":
+            out.append(total)
+        elif func == "mean":
+            out.append(total / n)
+        elif func == "count":
+            out.append(n)
+        else:
+            out.append(values[dq[0]])
+    return out
+
+
+def _cumulative_values(values: List[float], func: str) -> List[float]:
+    if func == "sum":
+        return list(accumulate(values))
+    if func == "min":
+        return list(accumulate(values, min))
+    if func == "max":
+        return list(accumulate(values, max))
+    if func == "count":
+        return list(range(1, len(values) + 1))
+    return [t / (i + 1) for i, t in enumerate(accumulate(values))]
+
+
+class WindowMixin:
+    """
+    rolling()/cumulative(): calcoli su finestre, opzionalmente per partizione e con un
+    ordinamento. Il risultato conserva l'ordine originale dei record, con un campo in più.
+
+    Le sottoclassi forniscono _numeric_series(field), _take(positions) e _with_field(name, values).
+    """
+
+    def _window_partitions(self, partition_by: Optional[GroupKey], order_by) -> List[List[int]]:
+        positions = list(range(len(self)))
+        if order_by is not None:
+            fields = (order_by,) if isinstance(order_by, str) else tuple(order_by)
+            positions = _sorted_positions(self, fields, _sort_directions(fields, False))
+        if partition_by is None:
+            return [positions]
+        key_fn = _key_function(partition_by)
+        parts: Dict[Any, List[int]] = {}
+        for i, r in zip(positions, self._take(positions)):
+            parts.setdefault(key_fn(r), []).append(i)
+        return list(parts.values())
+
+    def _window(self, field: str, name: str, partition_by, order_by,
+                compute: Callable[[List[float]], List[Any]]):
+        series = self._numeric_series(field)
+        result: List[Any] = [None] * len(series)
+        for part in self._window_partitions(partition_by, order_by):
+            for i, v in zip(part, compute([series[i] for i in part])):
+                result[i] = v
+        return self._with_field(name, result)
+
+    def rolling(self, field: str, window: int, func: str = "mean", *,
+                partition_by: Optional[GroupKey] = None, order_by: Union[None, str, Tuple[str, ...]] = None,
+                min_periods: Optional[int] = None, name: Optional[str] = None):
+        """
+        Finestra mobile degli ultimi `window` record (per partizione, nell'ordine di order_by):
+
+            ds.rolling("salary", 3, "mean", partition_by="city", order_by="year")
+            -> ogni record ha in più 'salary_rolling_mean'
+
+        func: sum, mean, min, max, count. I primi record hanno None finché la finestra
+        non contiene almeno min_periods valori (default: window).
+        """
+        _check_window_func(func)
+        if window <= 0:
+            raise ValueError("window deve essere positivo")
+        min_periods = window if min_periods is None else min_periods
+        if not 1 <= min_periods <= window:
+            raise ValueError("min_periods deve essere compreso tra 1 e window")
+        return self._window(field, name or f"{field}_rolling_{func}", partition_by, order_by,
+                            lambda vals: _rolling_values(vals, window, func, min_periods))
+
+    def cumulative(self, field: str, func: str = "sum", *,
+                   partition_by: Optional[GroupKey] = None, order_by: Union[None, str, Tuple[str, ...]] = None,
+                   name: Optional[str] = None):
+        """Valore cumulato (sum, mean, min, max, count) dall'inizio della partizione."""
+        _check_window_func(func)
+        return self._window(field, name or f"{field}_cum_{func}", partition_by, order_by,
+                            lambda vals: _cumulative_values(vals, func))
+
+
+# ======================
+#    INDICI SECONDARI
+# ======================
+
+class _HashIndex:
+    """valore -> posizioni (crescenti) dei record: lookup di uguaglianza in O(1)."""
+    kind = "hash"
+
+    def __init__(self, values):
+        self._map: Dict[Any, List[int]] = {}
+        for i, v in enumerate(values):
+            self._map.setdefault(v, []).append(i)
+
+    def lookup(self, value: Any) -> List[int]:
+        return self._map.get(value, [])
+
+
+class _SortedIndex:
+    """Valori ordinati + posizioni: uguaglianza e intervalli con bisect in O(log n + k)."""
+    kind = "sorted"
+
+    def __init__(self, values):
+        pairs = sorted((v, i) for i, v in enumerate(values))
+        self._keys = [v for v, _ in pairs]
+        self._positions = [i for _, i in pairs]
+
+    def lookup(self, value: Any) -> List[int]:
+        return self.range(value, value)
+
+    def range(self, low: Any, high: Any) -> List[int]:
+        lo = bisect_left(self._keys, low)
+        hi = bisect_right(self._keys, high)
+        return self._positions[lo:hi]
+
+    def compare(self, op: str, value: Any) -> List[int]:
+        """Posizioni dei record con valore <op> value, per op in <, <=, >, >=."""
+        if op == "<":
+            return self._positions[:bisect_left(self._keys, value)]
+        if op == "<=":
+            return self._positions[:bisect_right(self._keys, value)]
+        if op == ">":
+            return self._positions[bisect_right(self._keys, value):]
+        return self._positions[bisect_left(self._keys, value):]
+
+
+_INDEX_KINDS = {"hash": _HashIndex, "sorted": _SortedIndex}
+
+
+class IndexMixin:
+    """
+    Indici secondari per where()/where_between().
+
+    Le sottoclassi forniscono _field_values(field) (valori per posizione),
+    _take(positions) (nuovo dataset con i record indicati) e _data_version()
+    (cambia quando i record possono essere stati modificati). I dataset derivati
+    ereditano la *definizione* degli indici, che vengono ricostruiti al primo uso.
+    Un accesso per indice (ds[0]["city"] = ...) fa ricostruire gli indici di tutti i
+    dataset che condividono i record (ds.row(i), in sola lettura, no); dopo modifiche
+    fatte iterando va chiamato refresh_indexes().
+    """
+
+    def _index_map(self) -> Dict[str, Any]:
+        # campo -> indice costruito oppure, se ancora da costruire, il suo kind
+        indexes = self.__dict__.setdefault("_indexes", {})
+        version = self._data_version()
+        if self.__dict__.get("_indexes_version") != version:
+            # record forse modificati (anche tramite un dataset che li condivide): indici da ricostruire
+            for f, ix in indexes.items():
+                indexes[f] = ix if isinstance(ix, str) else ix.kind
+            self.__dict__["_indexes_version"] = version
+        return indexes
+
+    def _inherit_indexes(self, child):
+        for f, ix in self.__dict__.get("_indexes", {}).items():
+            child._index_map()[f] = ix if isinstance(ix, str) else ix.kind
+        return child
+
+    def _get_index(self, field: str):
+        ix = self._index_map().get(field)
+        if isinstance(ix, str):
+            ix = self._index_map()[field] = _INDEX_KINDS[ix](self._field_values(field))
+        return ix
+
+    def create_index(self, field: str, kind: str = "hash") -> None:
+        if kind not in _INDEX_KINDS:
+            raise ValueError(f"Tipo di indice sconosciuto: {kind} (ammessi: {', '.join(_INDEX_KINDS)})")
+        self._index_map()[field] = _INDEX_KINDS[kind](self._field_values(field))
+
+    def drop_index(self, field: str) -> None:
+        self._index_map().pop(field, None)
+
+    def refresh_indexes(self) -> None:
+        """Ricostruisce gli indici (da usare dopo modifiche sul posto ai record)."""
+        for f, ix in list(self._index_map().items()):
+            self._index_map()[f] = ix if isinstance(ix, str) else ix.kind
+
+    def indexes(self) -> Dict[str, str]:
+        return {f: ix if isinstance(ix, str) else ix.kind for f, ix in self._index_map().items()}
+
+    def where(self, /, **equals: Any):
+        """Record con campo == valore per ogni coppia; usa gli indici dove presenti."""
+        if not equals:
+            raise ValueError("Specificare almeno una condizione")
+        candidates = None
+        residual = {}
+        for f, v in equals.items():
+            ix = self._get_index(f)
+            if ix is None:
+                residual[f] = v
+            else:
+                found = ix.lookup(v)
+                candidates = set(found) if candidates is None else candidates.intersection(found)
+        positions = range(len(self)) if candidates is None else sorted(candidates)
+        for f, v in residual.items():
+            values = self._field_values(f)
+            positions = [i for i in positions if values[i] == v]
+        return self._take(list(positions))
+
+    def _filter_indexed(self, expr: 'Expr'):
+        """filter() con un'espressione: se una parte è risolvibile con gli indici, valuta solo i candidati."""
+        if not self.__dict__.get("_indexes"):
+            return None
+        # _get_index passa da _index_map: un indice costruito prima di una modifica viene ricostruito
+        candidates = expr._index_positions(self)
+        if candidates is None:
+            return None
+        positions = sorted(candidates)
+        # iterazione sul sottoinsieme: self[i] invaliderebbe la cache dei risultati
+        return self._take([i for i, r in zip(positions, self._take(positions)) if expr(r)])
+
+    def where_between(self, field: str, low: Any, high: Any):
+        """Record con low <= campo <= high; usa un indice 'sorted' se presente."""
+        ix = self._get_index(field)
+        if isinstance(ix, _SortedIndex):
+            positions = sorted(ix.range(low, high))
+        else:
+            positions = [i for i, v in enumerate(self._field_values(field)) if low <= v <= high]
+        return self._take(positions)
+
+
+# ======================
+#        SCHEMA
+# ======================
+
+def _type_matches(value: Any, typ: type) -> bool:
+    if typ is object:
+        return True
+    if isinstance(value, bool) and typ is not bool:
+        return False
+    if typ is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, typ)
+
+
+class Schema:
+    """
+    Campi ammessi, tipo di ciascuno e campi che possono valere None (o mancare).
+
+    Viene verificato una sola volta quando i dati entrano nel framework (costruttore,
+    read_csv/read_jsonl); i dataset derivati lo ereditano senza ri-validare, e le
+    aggregazioni sui campi numerici non nullable saltano i controlli per valore.
+    """
+
+    def __init__(self, fields: Dict[str, type], nullable: Union[bool, List[str]] = ()):
+        self.fields = dict(fields)
+        self.nullable = set(self.fields) if nullable is True else set(nullable or ())
+
+    @classmethod
+    def infer(cls, rows: List[Dict[str, Any]]) -> 'Schema':
+        """Schema dedotto dai dati: int+float -> float, tipi misti -> object."""
+        kinds: Dict[str, set] = {}
+        present: Dict[str, int] = {}
+        nullable = set()
+        for r in rows:
+            for k, v in r.items():
+                present[k] = present.get(k, 0) + 1
+                if v is None:
+                    nullable.add(k)
+                else:
+                    kinds.setdefault(k, set()).add(type(v))
+        fields = {}
+        for k in present:
+            found = kinds.get(k, set())
+            if len(found) == 1:
+                fields[k] = found.pop()
+            elif found == {int, float}:
+                fields[k] = float
+            else:
+                fields[k] = object
+            if present[k] < len(rows):
+                nullable.add(k)
+        return cls(fields, sorted(nullable))
+
+    def is_numeric(self, field: str) -> bool:
+        """True se ogni record ha sicuramente un valore int/float nel campo."""
+        return self.fields.get(field) in (int, float) and field not in self.nullable
+
+    def validate(self, rows: List[Dict[str, Any]]) -> None:
+        required = {f for f in self.fields if f not in self.nullable}
+        for i, r in enumerate(rows):
+            if not isinstance(r, _RECORD_TYPES):
+                raise ValueError("rows deve essere una lista di dizionari")
+            for k, v in r.items():
+                typ = self.fields.get(k)
+                if typ is None:
+                    raise ValueError(f"Record {i}: campo {k} non previsto dallo schema")
+                if v is None:
+                    if k not in self.nullable:
+                        raise ValueError(f"Record {i}: il campo {k} non può essere None")
+                elif not _type_matches(v, typ):
+                    raise TypeError(f"Record {i}: campo {k} atteso {typ.__name__}, trovato {type(v).__name__}")
+            if not required <= r.keys():
+                raise ValueError(f"Record {i}: campi mancanti {sorted(required - r.keys())}")
+
+    def __contains__(self, field: object) -> bool:
+        return field in self.fields
+
+    def __getitem__(self, field: str) -> type:
+        return self.fields[field]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Schema) and (self.fields, self.nullable) == (other.fields, other.nullable)
+
+    def __repr__(self) -> str:
+        parts = [f"{f}: {t.__name__}{'?' if f in self.nullable else ''}" for f, t in self.fields.items()]
+        return f"Schema({', '.join(parts)})"
+
+
+# ======================
+#    RECORD COMPATTI
+# ======================
+
+class CompactRow(Mapping):
+    """
+    Record in sola lettura con i valori in __slots__: la tupla dei campi e l'indice
+    campo -> posizione sono attributi della classe, condivisi da tutti i record con
+    gli stessi campi. Occupa circa un terzo di un dict con le stesse chiavi.
+
+    Le classi concrete (una per insieme di campi) vengono generate da _compact_class.
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+    _getters: tuple = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._getters[self._index[key]](self)
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # le classi generate non sono importabili: si ricostruisce da campi e valori
+        return _make_compact_row, (self._fields, tuple(self.values()))
+
+
+@functools.lru_cache(maxsize=None)
+def _compact_class(fields: Tuple[str, ...]) -> type:
+    slots = tuple(f"_v{i}" for i in range(len(fields)))
+    namespace: Dict[str, Any] = {"__slots__": slots, "_fields": fields,
+                                 "_index": {f: i for i, f in enumerate(fields)}}
+    # __init__ generato (come namedtuple): un'assegnazione per slot, senza cicli
+    body = f"    ({''.join(f'self.{s}, ' for s in slots)}) = values" if slots else "    pass"
+    exec(f"def __init__(self, values):\n{body}", {}, namespace)
+    cls = type("CompactRow", (CompactRow,), namespace)
+    cls._getters = tuple(operator.attrgetter(s) for s in slots)
+    return cls
+
+
+def _make_compact_row(fields: Tuple[str, ...], values: tuple) -> CompactRow:
+    return _compact_class(fields)(values)
+
+
+def _compact_rows(rows: List[Dict[str, Any]]) -> Optional[List[CompactRow]]:
+    """Record compatti se tutti hanno gli stessi campi (nello stesso ordine), altrimenti None."""
+    if not rows:
+        return []
+    fields = tuple(rows[0])
+    cls = _compact_class(fields)
+    out = []
+    for r in rows:
+        values = tuple(r.values())
+        if len(values) != len(fields) or (type(r) is not cls and tuple(r) != fields):
+            return None
+        out.append(cls(values))
+    return out
+
+
+# tipi accettati come record: dict o CompactRow
+_RECORD_TYPES = (dict, CompactRow)
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, CompactRow):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# ======================
+#   CACHE DEI RISULTATI
+# ======================
+
+def _freeze(value: Any) -> Any:
+    """
+    Argomenti di un'operazione -> chiave hashable: dict, liste e tuple diventano tuple
+    etichettate col tipo, perché hanno significati diversi (agg(top=("salary", "max"))
+    non è agg(top=["salary", "max"])).
+    """
+    if isinstance(value, dict):
+        return (dict, tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    return value
+
+
+@dataclass
+class CacheInfo:
+    hits: int
+    misses: int
+    invalidations: int
+    maxsize: int
+    currsize: int
+
+
+class ResultCacheMixin:
+    """
+    Cache LRU opzionale, per istanza, dei risultati di agg/sum/mean/.../group_by.
+
+    Si attiva con enable_cache(maxsize): la chiave è (operazione, argomenti). Il dataset
+    è immutabile per le operazioni del framework, ma __getitem__ restituisce riferimenti
+    ai record: ogni accesso per indice svuota la cache di tutti i dataset che condividono
+    i record (vedi _data_version() in IndexMixin), perché il record potrebbe essere
+    modificato. ds.row(i) restituisce invece una vista in sola lettura e lascia la cache
+    intatta. Dopo modifiche fatte iterando sul dataset va chiamato invalidate_cache().
+    """
+
+    def _cache_state(self) -> Optional[Dict[str, Any]]:
+        state = self.__dict__.get("_cache")
+        if state is not None and state["version"] != self._data_version():
+            # record forse modificati (anche tramite un dataset che li condivide): risultati da ricalcolare
+            if state["entries"]:
+                state["entries"].clear()
+                state["invalidations"] += 1
+            state["version"] = self._data_version()
+        return state
+
+    def enable_cache(self, maxsize: int = 128) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize deve essere positivo")
+        state = self._cache_state()
+        if state is None:
+            self.__dict__["_cache"] = {"entries": OrderedDict(), "maxsize": maxsize, "version": self._data_version(),
+                                       "hits": 0, "misses": 0, "invalidations": 0}
+        else:
+            state["maxsize"] = maxsize
+            while len(state["entries"]) > maxsize:
+                state["entries"].popitem(last=False)
+
+    def disable_cache(self) -> None:
+        self.__dict__.pop("_cache", None)
+
+    def invalidate_cache(self) -> None:
+        """Svuota la cache (da usare dopo modifiche sul posto ai record)."""
+        state = self._cache_state()
+        if state is not None and state["entries"]:
+            state["entries"].clear()
+            state["invalidations"] += 1
+
+    def cache_info(self) -> Optional[CacheInfo]:
+        state = self._cache_state()
+        if state is None:
+            return None
+        return CacheInfo(state["hits"], state["misses"], state["invalidations"],
+                         state["maxsize"], len(state["entries"]))
+
+    def _cached(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        state = self._cache_state()
+        if state is None:
+            return compute()
+        entries = state["entries"]
+        try:
+            if key in entries:
+                entries.move_to_end(key)
+                state["hits"] += 1
+                return entries[key]
+        except TypeError:  # argomenti non hashable: niente cache
+            return compute()
+        state["misses"] += 1
+        result = entries[key] = compute()
+        if len(entries) > state["maxsize"]:
+            entries.popitem(last=False)
+        return result
+
 
 # ======================
 #       CORE API
 # ======================
 
-class DataSet:
-    def __init__(self, rows: List[Dict[str, Any]]):
+class _RowsVersion:
+    """Contatore condiviso dai dataset con gli stessi oggetti record: cresce a ogni ds[i]."""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+class DataSet(ResultCacheMixin, AggregationMixin, IndexMixin, WindowMixin):
+    def __init__(self, rows: List[Dict[str, Any]], schema: Optional[Schema] = None):
         # M1: validazione
-        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        if not isinstance(rows, list):
+            raise ValueError("rows deve essere una lista di dizionari")
+        if schema is not None:
+            schema.validate(rows)
+        elif not all(isinstance(r, _RECORD_TYPES) for r in rows):
             raise ValueError("rows deve essere una lista di dizionari")
-        # copia superficiale
+        # copia superficiale: lo schema valida soltanto, la forma compatta si chiede con compact()
         self._rows = list(rows)
+        self._schema = schema
+
+    @classmethod
+    def _trusted(cls, rows: List[Dict[str, Any]], schema: Optional[Schema] = None) -> 'DataSet':
+        # costruttore interno per i dataset derivati: i record sono già validati, niente copia
+        obj = cls.__new__(cls)
+        obj._rows = rows
+        obj._schema = schema
+        return obj
+
+    @property
+    def schema(self) -> Optional[Schema]:
+        return self._schema
+
+    def _rows_version(self) -> _RowsVersion:
+        return self.__dict__.setdefault("_version", _RowsVersion())
+
+    def _data_version(self) -> int:
+        return self._rows_version().value
+
+    def _share_rows(self, child: 'DataSet') -> 'DataSet':
+        # child contiene (anche) gli stessi oggetti record: una modifica tramite uno dei due vale per entrambi
+        child.__dict__["_version"] = self._rows_version()
+        return child
 
     # ---------- Metodi magici (M2) ----------
     def __len__(self) -> int:
@@ -24,38 +1611,70 @@ class DataSet:
         return iter(self._rows)
 
     def __getitem__(self, index: int) -> Dict[str, Any]:
-        return self._rows[index]
+        record = self._rows[index]
+        if not isinstance(record, CompactRow):
+            # il chiamante riceve un riferimento modificabile al record: la nuova versione fa
+            # ricostruire indici e cache di tutti i dataset che condividono i record
+            self._rows_version().value += 1
+        return record
+
+    def row(self, index: int) -> Mapping:
+        """
+        Record in sola lettura (una vista, senza copia). A differenza di ds[i] non svuota
+        cache e indici: è l'accesso per indice da usare nei cicli che leggono soltanto.
+        """
+        record = self._rows[index]
+        return record if isinstance(record, CompactRow) else MappingProxyType(record)
 
     # ---------- Operazioni funzionali ----------
-    def filter(self, predicate: Callable[[Dict[str, Any]], bool]) -> 'DataSet':
-        return DataSet([r for r in self._rows if predicate(r)])
+    def filter(self, predicate: Union[Expr, Callable[[Dict[str, Any]], bool]]) -> 'DataSet':
+        if isinstance(predicate, Expr):
+            indexed = self._filter_indexed(predicate)
+            if indexed is not None:
+                return indexed
+        return self._share_rows(self._inherit_indexes(
+            DataSet._trusted([r for r in self._rows if predicate(r)], self._schema)))
 
     def map(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]]) -> 'DataSet':
         new_rows = []
         for r in self._rows:
             tr = transform(r)
-            if not isinstance(tr, dict):
+            if not isinstance(tr, _RECORD_TYPES):
                 raise TypeError("transform deve restituire un dict")
             new_rows.append(tr)
-        return DataSet(new_rows)
+        return self._share_rows(DataSet._trusted(new_rows))  # transform può restituire r stesso
 
     def reduce(self, func: Callable[[Any, Dict[str, Any]], Any], initial: Any) -> Any:
         return _py_reduce(func, self._rows, initial)
 
     # ---------- Raggruppamenti e aggregazioni ----------
-    def group_by(self, key_or_fn: Union[str, Callable[[Dict[str, Any]], Any]]) -> Dict[Any, 'DataSet']:
+    def group_by(self, key_or_fn: GroupKey) -> GroupBy:
+        return GroupBy(self, key_or_fn)  # i gruppi passano dalla cache al primo accesso
+
+    def _group_rows(self, key_or_fn: GroupKey) -> Dict[Any, 'DataSet']:
+        key_fn = _key_function(key_or_fn)
         groups: Dict[Any, List[Dict[str, Any]]] = {}
         for r in self._rows:
-            if isinstance(key_or_fn, str):
-                if key_or_fn not in r:
-                    raise ValueError(f"Campo {key_or_fn} mancante")
-                k = r[key_or_fn]
-            else:
-                k = key_or_fn(r)
-            groups.setdefault(k, []).append(r)
-        return {k: DataSet(v) for k, v in groups.items()}
+            groups.setdefault(key_fn(r), []).append(r)
+        return {k: self._share_rows(self._inherit_indexes(type(self)._trusted(v, self._schema)))
+                for k, v in groups.items()}
+
+    def _group_factory(self, rows: List[Dict[str, Any]]) -> 'DataSet':
+        return type(self)._trusted(rows)
+
+    def _accumulate(self, accs: Dict[str, _Accumulator]) -> None:
+        # campi garantiti numerici dallo schema: niente controlli per valore
+        if self._schema is not None and all(self._schema.is_numeric(f) for f in accs):
+            items = list(accs.items())
+            for r in self._rows:
+                for field, acc in items:
+                    acc.add(float(r[field]))
+            return
+        _accumulate_rows(self._rows, accs)
 
     def _numeric_series(self, field: str) -> List[float]:
+        if self._schema is not None and self._schema.is_numeric(field):
+            return [float(r[field]) for r in self._rows]
         values = []
         for r in self._rows:
             if field not in r:
@@ -66,23 +1685,450 @@ class DataSet:
             values.append(float(v))
         return values
 
-    def sum(self, field: str) -> float:
-        vals = self._numeric_series(field)
-        return sum(vals)
+    # ---------- Supporto indici ----------
+    def _field_values(self, field: str) -> List[Any]:
+        try:
+            return [r[field] for r in self._rows]
+        except KeyError:
+            raise ValueError(f"Campo {field} mancante in un record") from None
 
-    def mean(self, field: str) -> float:
-        vals = self._numeric_series(field)
-        if not vals:
-            raise ValueError("Dataset vuoto")
-        return sum(vals) / len(vals)
+    def _take(self, positions: List[int]) -> 'DataSet':
+        return self._share_rows(self._inherit_indexes(
+            type(self)._trusted([self._rows[i] for i in positions], self._schema)))
 
-    def min(self, field: str) -> float:
-        vals = self._numeric_series(field)
-        return min(vals)
+    def _with_field(self, name: str, values: List[Any]) -> 'DataSet':
+        return type(self)._trusted([{**r, name: v} for r, v in zip(self._rows, values)])
 
-    def max(self, field: str) -> float:
-        vals = self._numeric_series(field)
-        return max(vals)
+    # ---------- Conversioni ----------
+    def compact(self) -> 'DataSet':
+        """Copia con record CompactRow in sola lettura (se tutti hanno gli stessi campi)."""
+        rows = _compact_rows(self._rows)
+        if rows is None:
+            raise ValueError("Per la forma compatta tutti i record devono avere gli stessi campi")
+        return self._inherit_indexes(type(self)._trusted(rows, self._schema))
+
+    def to_columnar(self) -> 'ColumnarDataSet':
+        return ColumnarDataSet(self._rows)
+
+    def lazy(self) -> 'LazyDataSet':
+        """Vista pigra: filter/map vengono registrati e fusi in un'unica passata."""
+        return LazyDataSet(lambda: iter(self), type(self), origin=self)
+
+    # ---------- Ordinamento ----------
+    def sort_by(self, *fields: str, descending: Union[bool, List[bool]] = False) -> 'DataSet':
+        """Ordinamento stabile su uno o più campi; descending globale o per campo."""
+        return self._take(_sorted_positions(self, fields, _sort_directions(fields, descending)))
+
+    def top_k(self, field: str, k: int) -> 'DataSet':
+        """I k record con field più alto (in ordine decrescente), con un heap: O(n log k)."""
+        values = self._field_values(field)
+        return self._take(heapq.nlargest(k, range(len(values)), key=values.__getitem__))
+
+    def bottom_k(self, field: str, k: int) -> 'DataSet':
+        values = self._field_values(field)
+        return self._take(heapq.nsmallest(k, range(len(values)), key=values.__getitem__))
+
+    def join(self, other: 'DataSet', on: Union[str, Tuple[str, ...]], how: str = "inner",
+             suffixes: Tuple[str, str] = ("_x", "_y")) -> 'DataSet':
+        """
+        Hash join con other su uno o più campi (on="id" oppure on=("dept", "year")).
+
+        how: "inner", "left" o "outer". La tabella hash viene costruita su other, self viene
+        scandito una sola volta: O(n + m), e le righe seguono l'ordine di self (con "outer"
+        le righe di other senza corrispondenza vanno in fondo). Solo per "inner" la tabella
+        va sul lato più piccolo, e l'ordine segue il lato scandito. I campi non chiave
+        presenti in entrambi i lati ricevono i suffissi.
+        """
+        other_rows = list(other)  # una sola esecuzione anche se other è un piano pigro
+        if how != "inner" or len(other_rows) <= len(self):
+            rows = _hash_join(iter(self), other_rows, on, how, suffixes, probe_is_left=True)
+        else:
+            rows = _hash_join(iter(other_rows), list(self), on, how, suffixes, probe_is_left=False)
+        return type(self)._trusted(list(rows))
+
+    def parallel(self, workers: Optional[int] = None, backend: str = "process",
+                 chunksize: Optional[int] = None) -> 'ParallelDataSet':
+        """Esecutore opt-in che distribuisce map/filter/reduce su un pool di worker."""
+        return ParallelDataSet(self, workers=workers, backend=backend, chunksize=chunksize)
+
+    # ---------- Lettura da file ----------
+    @classmethod
+    def read_csv(cls, path: str, *, chunksize: Optional[int] = None, schema: Union[None, Schema, Dict[str, type]] = None):
+        """
+        Legge un CSV inferendo i tipi (int, float, bool, '' -> None) o convertendo
+        secondo schema ({campo: tipo} o Schema, che viene anche validato). Con chunksize restituisce un iteratore di
+        DataSet da al più chunksize record: la memoria resta limitata al blocco corrente.
+        I campi non presenti nello schema vengono comunque inferiti; con uno Schema sono
+        aggiunti, coi tipi dedotti, allo schema del dataset (di ogni blocco, con chunksize).
+        """
+        return _read(cls, lambda: _iter_csv(path, schema), chunksize, schema)
+
+    @classmethod
+    def read_jsonl(cls, path: str, *, chunksize: Optional[int] = None, schema: Union[None, Schema, Dict[str, type]] = None):
+        """Come read_csv, per file JSON Lines (un oggetto JSON per riga)."""
+        return _read(cls, lambda: _iter_jsonl(path, schema), chunksize, schema)
+
+    @classmethod
+    def scan_csv(cls, path: str, *, schema: Union[None, Schema, Dict[str, type]] = None) -> 'LazyDataSet':
+        """Piano pigro che legge il CSV in streaming ad ogni esecuzione (file più grandi della RAM)."""
+        return LazyDataSet(lambda: _iter_csv(path, schema), cls)
+
+    @classmethod
+    def scan_jsonl(cls, path: str, *, schema: Union[None, Schema, Dict[str, type]] = None) -> 'LazyDataSet':
+        return LazyDataSet(lambda: _iter_jsonl(path, schema), cls)
+
+    @classmethod
+    def open_columnar(cls, path: str) -> 'ColumnarDataSet':
+        """Apre un file binario colonnare (vedi ExportColumnarMixin) come ColumnarDataSet."""
+        return ColumnarDataSet.open_columnar(path)
+
+
+# ======================
+#   MODALITÀ COLONNARE
+# ======================
+
+# typecode di array.array per i tipi memorizzabili in colonne compatte
+_TYPECODES = {int: "q", float: "d"}
+
+
+def _typecode(col) -> Optional[str]:
+    """typecode di una colonna tipizzata (array.array o memoryview su file), None per le list."""
+    if isinstance(col, array):
+        return col.typecode
+    if isinstance(col, memoryview):
+        return col.format
+    return None
+
+
+def _columns_schema(types: Dict[str, type]) -> Schema:
+    # le colonne array non possono contenere None; quelle a oggetti sì
+    return Schema(types, nullable=[f for f, t in types.items() if t is object])
+
+
+def _infer_column(values: List[Any]) -> tuple:
+    """Sceglie il tipo di una colonna: int/float omogenei -> array tipizzato, altrimenti list."""
+    kinds = {type(v) for v in values}
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        if kind in _TYPECODES:
+            try:
+                return kind, array(_TYPECODES[kind], values)
+            except OverflowError:
+                pass  # interi oltre i 64 bit: restano oggetti Python
+    return object, list(values)
+
+
+def _declared_column(values: List[Any], typ: type):
+    """Colonna del tipo dichiarato nello schema (valori già validati): array se possibile."""
+    if typ in _TYPECODES and None not in values:
+        try:
+            return array(_TYPECODES[typ], [typ(v) for v in values])
+        except OverflowError:
+            pass
+    return list(values)
+
+
+class ColumnarDataSet(DataSet):
+    """
+    DataSet memorizzato per colonne: un array.array per ogni campo int/float
+    (list per gli altri tipi) più uno Schema dei tipi delle colonne.
+
+    Tutti i record devono avere gli stessi campi. Con uno schema le colonne usano i
+    tipi dichiarati (es. interi in un campo float -> array di double), altrimenti i
+    tipi vengono dedotti. __iter__/__getitem__ restituiscono dict costruiti al volo:
+    modificarli non altera il dataset.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], schema: Optional[Schema] = None):
+        if not isinstance(rows, list):
+            raise ValueError("rows deve essere una lista di dizionari")
+        if schema is not None:
+            schema.validate(rows)
+        elif not all(isinstance(r, _RECORD_TYPES) for r in rows):
+            raise ValueError("rows deve essere una lista di dizionari")
+        self._build(rows, schema)
+
+    def _build(self, rows: List[Dict[str, Any]], schema: Optional[Schema] = None) -> None:
+        fields = list(rows[0].keys()) if rows else []
+        expected = set(fields)
+        for r in rows:
+            if set(r.keys()) != expected:
+                raise ValueError("In modalità colonnare tutti i record devono avere gli stessi campi")
+        types: Dict[str, type] = {}
+        self._columns: Dict[str, Any] = {}
+        for f in fields:
+            values = [r[f] for r in rows]
+            if schema is None:
+                types[f], self._columns[f] = _infer_column(values)
+            else:
+                self._columns[f] = _declared_column(values, schema[f])
+        self._schema = _columns_schema(types) if schema is None else schema
+        self._length = len(rows)
+
+    @classmethod
+    def _trusted(cls, rows: List[Dict[str, Any]], schema: Optional[Schema] = None) -> 'ColumnarDataSet':
+        obj = cls.__new__(cls)
+        obj._build(rows)
+        return obj
+
+    @classmethod
+    def _from_columns(cls, columns: Dict[str, Any], schema: Schema, length: int) -> 'ColumnarDataSet':
+        # costruttore interno: colonne già tipizzate, nessuna validazione
+        obj = cls.__new__(cls)
+        obj._columns = columns
+        obj._schema = schema
+        obj._length = length
+        return obj
+
+    @property
+    def schema(self) -> Schema:
+        return self._schema
+
+    def column(self, field: str):
+        if field not in self._columns:
+            raise ValueError(f"Campo {field} mancante")
+        return self._columns[field]
+
+    def to_rows(self) -> DataSet:
+        return DataSet(list(self))
+
+    def to_columnar(self) -> 'ColumnarDataSet':
+        return self
+
+    def compact(self) -> 'ColumnarDataSet':
+        """Le colonne sono già la forma compatta (e __getitem__ restituisce copie): il dataset stesso."""
+        return self
+
+    @classmethod
+    def open_columnar(cls, path: str) -> 'ColumnarDataSet':
+        """Apre un file scritto da export_columnar: le colonne vengono mappate solo quando servono."""
+        columns, schema, length = _open_columnar_file(path)
+        return cls._from_columns(columns, schema, length)
+
+    # ---------- Metodi magici ----------
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = tuple(self._columns)
+        if not names:
+            return iter([{} for _ in range(self._length)])
+        return (dict(zip(names, values)) for values in zip(*self._columns.values()))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("indice fuori dal dataset")
+        return {f: col[index] for f, col in self._columns.items()}
+
+    def row(self, index: int) -> Dict[str, Any]:
+        # ds[i] restituisce già una copia: nessuna versione da aggiornare
+        return self[index]
+
+    # ---------- Operazioni funzionali ----------
+    def _select(self, mask) -> 'ColumnarDataSet':
+        if _np is not None and isinstance(mask, _np.ndarray):
+            # maschera NumPy (da un'espressione): selezione vettoriale sulle colonne tipizzate
+            mask = mask.astype(bool)
+            columns = {}
+            for f, col in self._columns.items():
+                code = _typecode(col)
+                if code:
+                    columns[f] = array(code, _np.frombuffer(col, dtype=code)[mask].tobytes())
+                else:
+                    columns[f] = list(compress(col, mask.tolist()))
+            return self._inherit_indexes(type(self)._from_columns(columns, self._schema, int(mask.sum())))
+        mask = list(mask)
+        columns = {}
+        for f, col in self._columns.items():
+            selected = compress(col, mask)
+            columns[f] = array(_typecode(col), selected) if _typecode(col) else list(selected)
+        return self._inherit_indexes(type(self)._from_columns(columns, self._schema, sum(mask)))
+
+    def _take(self, positions: List[int]) -> 'ColumnarDataSet':
+        columns = {}
+        for f, col in self._columns.items():
+            selected = [col[i] for i in positions]
+            columns[f] = array(_typecode(col), selected) if _typecode(col) else selected
+        return self._inherit_indexes(type(self)._from_columns(columns, self._schema, len(positions)))
+
+    def _with_field(self, name: str, values: List[Any]) -> 'ColumnarDataSet':
+        typ, col = _infer_column(values)
+        columns = {**self._columns, name: col}
+        return type(self)._from_columns(columns, _columns_schema({**self._schema.fields, name: typ}), self._length)
+
+    def _field_values(self, field: str):
+        return self.column(field)
+
+    def filter(self, predicate: Union[Expr, Callable[[Dict[str, Any]], bool]]) -> 'ColumnarDataSet':
+        if isinstance(predicate, Expr):
+            indexed = self._filter_indexed(predicate)
+            if indexed is not None:
+                return indexed
+            mask = predicate.eval_columns(self._columns)
+            if not isinstance(mask, (list, array)) and not (_np is not None and isinstance(mask, _np.ndarray)):
+                mask = [bool(mask)] * self._length  # espressione costante
+            return self._select(mask)
+        return self._select(bool(predicate(r)) for r in self)
+
+    def map(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]]) -> 'ColumnarDataSet':
+        new_rows = []
+        for r in self:
+            tr = transform(r)
+            if not isinstance(tr, _RECORD_TYPES):
+                raise TypeError("transform deve restituire un dict")
+            new_rows.append(tr)
+        return type(self)._trusted(new_rows)
+
+    def reduce(self, func: Callable[[Any, Dict[str, Any]], Any], initial: Any) -> Any:
+        return _py_reduce(func, self, initial)
+
+    def _key_column(self, key_or_fn: GroupKey):
+        if callable(key_or_fn):
+            return (key_or_fn(r) for r in self)
+        if isinstance(key_or_fn, str):
+            return self.column(key_or_fn)
+        return zip(*(self.column(f) for f in key_or_fn))
+
+    def _group_rows(self, key_or_fn: GroupKey) -> Dict[Any, 'ColumnarDataSet']:
+        positions: Dict[Any, List[int]] = {}
+        for i, k in enumerate(self._key_column(key_or_fn)):
+            positions.setdefault(k, []).append(i)
+        return {k: self._take(pos) for k, pos in positions.items()}
+
+    def _iter_field(self, field: str) -> Iterator[Any]:
+        return iter(self.column(field))
+
+    def _keyed_columns(self, key_or_fn: GroupKey, fields: List[str]) -> Tuple[Iterator[Any], List[Any]]:
+        return self._key_column(key_or_fn), [self.column(f) for f in fields]
+
+    # ---------- Aggregazioni sulle colonne ----------
+    def _numeric_column(self, field: str):
+        """Colonna numerica pronta per le aggregazioni (array tipizzato o lista di float)."""
+        col = self.column(field)
+        if _typecode(col):
+            return col
+        for v in col:
+            if not isinstance(v, (int, float)):
+                raise TypeError(f"Valore non numerico trovato: {v}")
+        return col
+
+    def _numeric_series(self, field: str) -> List[float]:
+        return [float(v) for v in self._numeric_column(field)]
+
+    def _accumulate(self, accs: Dict[str, _Accumulator]) -> None:
+        # una passata per colonna: niente dict per riga
+        for field, acc in accs.items():
+            acc.merge(_Accumulator.from_values(acc.aggs, self.column(field)))
+
+
+# ======================
+#  DATASET INCREMENTALE
+# ======================
+
+class AppendableDataSet(DataSet):
+    """
+    DataSet a cui si aggiungono record con append()/extend(), mantenendo aggiornati
+    in modo incrementale gli aggregati registrati:
+
+        ds.track(salary=["sum", "mean"])                  -> ds.agg/sum/mean sul campo in O(1)
+        ds.track_groups("city", salary="mean", n="count") -> ds.group_by("city").agg(...) senza scansione
+
+    Registrare un aggregato costa una scansione dei record presenti; da lì in poi ogni
+    append aggiorna solo gli accumulatori. I quantili restano esatti ma conservano i valori.
+    Dopo un accesso per indice (ds[0]["salary"] = ...) gli aggregati registrati vengono
+    ricalcolati con una scansione al primo uso, come la cache dei risultati.
+    """
+
+    def _sync_running(self) -> None:
+        # un record consegnato da ds[i] può essere stato modificato: accumulatori da ricalcolare
+        version = self._data_version()
+        if self.__dict__.get("_running_version", version) != version:
+            running = self.__dict__.get("_running_aggs", {})
+            for field, acc in running.items():
+                running[field] = _Accumulator(acc.aggs)
+            _accumulate_rows(self._rows, running)
+            for state in self.__dict__.get("_running_group_aggs", {}).values():
+                state.reset()
+                state.extend(*_keyed_rows(self._rows, state.key, state.fields))
+        self.__dict__["_running_version"] = version
+
+    def _running(self) -> Dict[str, _Accumulator]:
+        self._sync_running()
+        return self.__dict__.setdefault("_running_aggs", {})
+
+    def _running_groups(self) -> Dict[tuple, _GroupAggregator]:
+        self._sync_running()
+        return self.__dict__.setdefault("_running_group_aggs", {})
+
+    def track(self, /, **specs: Union[str, List[str]]) -> None:
+        running = self._running()
+        for field, aggs in _make_accumulators(specs).items():
+            old = running.get(field)
+            if old is not None and set(aggs.aggs) <= set(old.aggs):
+                continue
+            merged = _Accumulator(list(dict.fromkeys((old.aggs if old else []) + aggs.aggs)))
+            _accumulate_rows(self._rows, {field: merged})
+            running[field] = merged
+
+    def track_groups(self, key_or_fn: GroupKey, /, **named: Union[str, Tuple[str, str], List[str]]) -> None:
+        state = _GroupAggregator(key_or_fn, named)
+        state.extend(*_keyed_rows(self._rows, key_or_fn, state.fields))
+        self._running_groups()[(_freeze(key_or_fn), _freeze(named))] = state
+
+    def untrack(self) -> None:
+        self.__dict__.pop("_running_aggs", None)
+        self.__dict__.pop("_running_group_aggs", None)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        self.extend([row])
+
+    def extend(self, rows: List[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        if self._schema is not None:
+            self._schema.validate(rows)
+        elif not all(isinstance(r, _RECORD_TYPES) for r in rows):
+            raise ValueError("rows deve essere una lista di dizionari")
+        # prima gli accumulatori: se un valore non è valido il dataset resta invariato
+        running = self._running()
+        if running:
+            updated = {f: _Accumulator(acc.aggs) for f, acc in running.items()}
+            _accumulate_rows(rows, updated)
+        groups = self._running_groups()
+        parts = {}
+        for gk, state in groups.items():
+            parts[gk] = _GroupAggregator(state.key, state.named)
+            parts[gk].extend(*_keyed_rows(rows, state.key, state.fields))
+        if running:
+            for f, acc in updated.items():
+                running[f].merge(acc)
+        for gk, part in parts.items():
+            groups[gk].merge(part)
+        self._rows.extend(rows)
+        self.invalidate_cache()
+        self.refresh_indexes()
+
+    def agg(self, /, **specs: Union[str, List[str]]) -> Dict[str, Dict[str, float]]:
+        accs = _make_accumulators(specs)
+        running = self._running()
+        if all(f in running and set(a.aggs) <= set(running[f].aggs) for f, a in accs.items()):
+            return {f: {a: running[f].result(a) for a in acc.aggs} for f, acc in accs.items()}
+        return super().agg(**specs)
+
+    def _agg_one(self, field: str, agg: str) -> float:
+        acc = self._running().get(field)
+        if acc is not None and agg in acc.aggs:
+            return acc.result(agg)
+        return super()._agg_one(field, agg)
+
+    def _group_agg(self, key_or_fn: GroupKey, named: Dict[str, Any]):
+        state = self._running_groups().get((_freeze(key_or_fn), _freeze(named)))
+        if state is not None:
+            return state.rows()
+        return super()._group_agg(key_or_fn, named)
 
 
 # ======================
@@ -92,23 +2138,735 @@ class DataSet:
 class ExportJSONMixin:
     def export_json(self, path: str, *, indent: int = 2) -> None:
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(self._rows, f, indent=indent, ensure_ascii=False)
+            json.dump(list(iter(self)), f, indent=indent, ensure_ascii=False, default=_json_default)
 
 
 class ExportCSVMixin:
     def export_csv(self, path: str) -> None:
         # colonne = unione di tutte le chiavi
-        all_keys = sorted({k for r in self._rows for k in r.keys()})
+        all_keys = sorted({k for r in self for k in r.keys()})
         with open(path, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=all_keys)
             writer.writeheader()
-            for r in self._rows:
+            for r in self:
                 writer.writerow(r)
 
 
+# ---------- Export in streaming ----------
+
+@dataclass
+class ExportStats:
+    """Esito di un export in streaming: righe, byte su disco e throughput."""
+    path: str
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else float("inf")
+
+    def __str__(self) -> str:
+        return (f"{self.path}: {self.rows} righe, {self.bytes / 1e6:.2f} MB in {self.seconds:.3f}s "
+                f"({self.rows_per_sec:,.0f} righe/s, {self.mb_per_sec:.1f} MB/s)")
+
+
+def _open_text_out(path: str, compress: Optional[str]):
+    if compress is None and path.endswith(".gz"):
+        compress = "gzip"
+    if compress == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    if compress is not None:
+        raise ValueError(f"Compressione non supportata: {compress}")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def write_jsonl(rows, path: str, *, batch_size: int = 10_000, compress: Optional[str] = None) -> ExportStats:
+    """Scrive un iterabile di record come JSON Lines, a blocchi di batch_size righe."""
+    start = time.perf_counter()
+    n = 0
+    dumps = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+    with _open_text_out(path, compress) as f:
+        batch = []
+        for r in rows:
+            batch.append(dumps(r))
+            if len(batch) == batch_size:
+                f.write("\n".join(batch) + "\n")
+                n += len(batch)
+                batch = []
+        if batch:
+            f.write("\n".join(batch) + "\n")
+            n += len(batch)
+    return ExportStats(path, n, os.path.getsize(path), time.perf_counter() - start)
+
+
+def write_csv(rows, path: str, *, fieldnames: Optional[List[str]] = None, sample: int = 1000,
+              batch_size: int = 10_000, compress: Optional[str] = None, extrasaction: str = "raise") -> ExportStats:
+    """
+    Scrive un iterabile di record in CSV senza una scansione preliminare completa.
+
+    Le colonne sono fieldnames se dichiarate, altrimenti l'unione ordinata delle chiavi
+    dei primi `sample` record. Un record con campi fuori schema solleva ValueError,
+    oppure quei campi vengono scartati con extrasaction="ignore" (come csv.DictWriter).
+    """
+    if extrasaction not in ("raise", "ignore"):
+        raise ValueError(f"extrasaction non supportato: {extrasaction} (ammessi: raise, ignore)")
+    start = time.perf_counter()
+    rows = iter(rows)
+    if fieldnames is None:
+        head = list(islice(rows, sample))
+        fieldnames = sorted({k for r in head for k in r.keys()})
+        rows = chain(head, rows)
+    fields = list(fieldnames)
+    allowed = set(fields)
+    n = 0
+    with _open_text_out(path, compress) as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        batch = []
+        for r in rows:
+            if extrasaction == "raise" and not r.keys() <= allowed:
+                raise ValueError(f"Campi non previsti dallo schema CSV: {sorted(r.keys() - allowed)}")
+            batch.append([r.get(k, "") for k in fields])
+            if len(batch) == batch_size:
+                writer.writerows(batch)
+                n += len(batch)
+                batch = []
+        writer.writerows(batch)
+        n += len(batch)
+    return ExportStats(path, n, os.path.getsize(path), time.perf_counter() - start)
+
+
+class ExportStreamMixin:
+    """Mixin per export in streaming (JSON Lines / CSV, gzip opzionale) da qualunque sorgente iterabile."""
+    def export_jsonl(self, path: str, *, batch_size: int = 10_000, compress: Optional[str] = None) -> ExportStats:
+        return write_jsonl(self, path, batch_size=batch_size, compress=compress)
+
+    def export_csv_stream(self, path: str, *, fieldnames: Optional[List[str]] = None, sample: int = 1000,
+                          batch_size: int = 10_000, compress: Optional[str] = None,
+                          extrasaction: str = "raise") -> ExportStats:
+        return write_csv(self, path, fieldnames=fieldnames, sample=sample, batch_size=batch_size,
+                         compress=compress, extrasaction=extrasaction)
+
+
+# ---------- Formato binario colonnare ----------
+#
+# Layout del file:
+#   magic (8 byte) | lunghezza header (uint64 LE) | header JSON | blocchi colonna
+# Ogni blocco inizia a un offset multiplo di 8: le colonne int/float sono i byte
+# grezzi dell'array.array (typecode 'q'/'d'), le altre una lista JSON.
+
+_COLUMNAR_MAGIC = b"DSCOL1\0\0"
+_TYPE_NAMES = {int: "int", float: "float", object: "object"}
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def write_columnar(ds: 'ColumnarDataSet', path: str) -> None:
+    blobs = []
+    for f, col in ds._columns.items():
+        code = _typecode(col)
+        blobs.append((f, code, col if code else json.dumps(list(col), ensure_ascii=False).encode("utf-8")))
+    meta = []
+    offset = 0
+    for f, code, data in blobs:
+        nbytes = len(data) * data.itemsize if code else len(data)
+        meta.append({"name": f, "type": _TYPE_NAMES.get(ds._schema[f], "object"), "typecode": code,
+                     "offset": offset, "nbytes": nbytes})
+        offset = _align8(offset + nbytes)
+    header = json.dumps({"rows": len(ds), "byteorder": sys.byteorder, "columns": meta}).encode("utf-8")
+    data_start = _align8(len(_COLUMNAR_MAGIC) + 8 + len(header))
+    with open(path, "wb") as out:
+        out.write(_COLUMNAR_MAGIC)
+        out.write(struct.pack("<Q", len(header)))
+        out.write(header)
+        for (_, _, data), m in zip(blobs, meta):
+            out.write(b"\0" * (data_start + m["offset"] - out.tell()))
+            out.write(data)
+
+
+class _MmapColumns(Mapping):
+    """Colonne di un file colonnare: ciascuna viene letta (zero-copy) solo al primo accesso."""
+
+    def __init__(self, buf: mmap.mmap, meta: List[Dict[str, Any]], data_start: int, byteorder: str):
+        self._buf = buf
+        self._meta = {m["name"]: m for m in meta}
+        self._data_start = data_start
+        self._swap = byteorder != sys.byteorder
+        self._loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._loaded:
+            m = self._meta[name]
+            start = self._data_start + m["offset"]
+            raw = memoryview(self._buf)[start:start + m["nbytes"]]
+            if m["typecode"] is None:
+                col = json.loads(bytes(raw).decode("utf-8"))
+            elif self._swap:
+                col = array(m["typecode"], raw.tobytes())
+                col.byteswap()
+            else:
+                col = raw.cast(m["typecode"])
+            self._loaded[name] = col
+        return self._loaded[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._meta
+
+    def __iter__(self):
+        return iter(self._meta)
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+
+def _open_columnar_file(path: str) -> tuple:
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buf[:len(_COLUMNAR_MAGIC)] != _COLUMNAR_MAGIC:
+        raise ValueError(f"{path} non è un file colonnare DataSet")
+    pos = len(_COLUMNAR_MAGIC)
+    (header_len,) = struct.unpack("<Q", buf[pos:pos + 8])
+    header = json.loads(buf[pos + 8:pos + 8 + header_len].decode("utf-8"))
+    data_start = _align8(pos + 8 + header_len)
+    types = {v: k for k, v in _TYPE_NAMES.items()}
+    schema = _columns_schema({m["name"]: types[m["type"]] for m in header["columns"]})
+    columns = _MmapColumns(buf, header["columns"], data_start, header["byteorder"])
+    return columns, schema, header["rows"]
+
+
+class ExportColumnarMixin:
+    """Mixin per l'export nel formato binario colonnare, riletto con DataSet.open_columnar."""
+    def export_columnar(self, path: str) -> None:
+        ds = self if isinstance(self, ColumnarDataSet) else ColumnarDataSet(list(iter(self)))
+        write_columnar(ds, path)
+
+
+# ======================
+#  LETTURA IN STREAMING
+# ======================
+
+_INT_RE = re.compile(r"^[-+]?(0|[1-9][0-9]*)$")
+_FLOAT_RE = re.compile(r"^[-+]?([0-9]+\.[0-9]*|\.[0-9]+|[0-9]+)([eE][-+]?[0-9]+)?$")
+_BOOL_TEXT = {"true": True, "false": False}
+
+
+def _infer_value(text: Optional[str]) -> Any:
+    """Tipo di un valore testuale CSV: '' o None (riga corta) -> None, int, float, bool, altrimenti str."""
+    if text is None or text == "":
+        return None
+    if text.lstrip("+-").isdigit():
+        # niente conversione per codici con zeri iniziali (es. CAP '00123')
+        return int(text) if _INT_RE.match(text) else text
+    if _FLOAT_RE.match(text):
+        return float(text)
+    return _BOOL_TEXT.get(text.lower(), text)
+
+
+def _coerce(field: str, value: Any, typ: type) -> Any:
+    if value is None or value == "":
+        return None
+    if isinstance(value, typ) and not (typ is int and isinstance(value, bool)):
+        return value
+    try:
+        if typ is bool and isinstance(value, str):
+            return {"true": True, "1": True, "false": False, "0": False}[value.strip().lower()]
+        return typ(value)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Valore {value!r} non convertibile in {typ.__name__} (campo {field})") from None
+
+
+def _apply_schema(r: Dict[str, Any], schema: Dict[str, type]) -> Dict[str, Any]:
+    for f, typ in schema.items():
+        if typ is object:
+            continue
+        if f in r:
+            r[f] = _coerce(f, r[f], typ)
+    return r
+
+
+def _iter_csv(path: str, schema: Optional[Dict[str, type]]) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        types = dict(schema.fields if isinstance(schema, Schema) else schema or {})
+        reader = csv.DictReader(f)
+        for r in reader:
+            # DictReader: None per i campi mancanti (gestiti come vuoti), lista sotto None per quelli in più
+            if None in r:
+                raise ValueError(f"Riga {reader.line_num}: {len(r[None])} valori oltre le colonne dell'intestazione")
+            yield {k: _coerce(k, v, types[k]) if k in types and types[k] is not object else _infer_value(v)
+                   for k, v in r.items()}
+
+
+def _iter_jsonl(path: str, schema: Optional[Dict[str, type]]) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            if not isinstance(r, dict):
+                raise ValueError(f"Riga {lineno}: atteso un oggetto JSON")
+            if schema is not None:
+                _apply_schema(r, schema.fields if isinstance(schema, Schema) else schema)
+            yield r
+
+
+def _chunked(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for r in rows:
+        chunk.append(r)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _with_inferred_fields(schema: Schema, rows: List[Dict[str, Any]]) -> Schema:
+    """schema più i campi dei record che non dichiara, coi tipi dedotti da Schema.infer."""
+    extra = [f for f in dict.fromkeys(k for r in rows for k in r) if f not in schema]
+    if not extra:
+        return schema
+    inferred = Schema.infer([{f: r[f] for f in extra if f in r} for r in rows])
+    return Schema({**schema.fields, **inferred.fields}, sorted(schema.nullable | inferred.nullable))
+
+
+def _read(cls: type, source: Callable[[], Iterator[Dict[str, Any]]], chunksize: Optional[int],
+          schema: Union[None, Schema, Dict[str, type]]):
+    # con uno Schema i record vengono validati qui, una volta sola
+    def build(rows: List[Dict[str, Any]]):
+        if not isinstance(schema, Schema):
+            return cls(rows)
+        return cls(rows, schema=_with_inferred_fields(schema, rows))
+    if chunksize is None:
+        return build(list(source()))
+    if chunksize <= 0:
+        raise ValueError("chunksize deve essere positivo")
+    return (build(chunk) for chunk in _chunked(source(), chunksize))
+
+
+# ======================
+#      PIANO PIGRO
+# ======================
+
+def _fuse_steps(steps: tuple) -> List[tuple]:
+    """Fonde i passi consecutivi dello stesso tipo: più filter -> un predicato, più map -> una funzione."""
+    fused: List[tuple] = []
+    for kind, fn in steps:
+        if fused and fused[-1][0] == kind:
+            fused[-1][1].append(fn)
+        else:
+            fused.append((kind, [fn]))
+    stages = []
+    for kind, fns in fused:
+        if kind == "filter" and all(isinstance(p, Expr) for p in fns):
+            stages.append((kind, _py_reduce(operator.and_, fns), len(fns)))
+        elif kind == "filter":
+            stages.append((kind, fns[0] if len(fns) == 1 else (lambda r, fns=fns: all(p(r) for p in fns)), len(fns)))
+        else:
+            stages.append((kind, fns, len(fns)))
+    return stages
+
+
+def _field_value(r: Dict[str, Any], field: str) -> Any:
+    if field not in r:
+        raise ValueError(f"Campo {field} mancante in un record")
+    return r[field]
+
+
+class LazyDataSet(ExportJSONMixin, ExportCSVMixin, ExportStreamMixin, ExportColumnarMixin, AggregationMixin):
+    """
+    Piano di esecuzione pigro su una sorgente di record.
+
+    filter/map restituiscono un nuovo piano senza toccare i dati; l'esecuzione avviene
+    in un'unica passata (passi consecutivi fusi) solo con collect(), count(), reduce(),
+    group_by(), le aggregazioni (in streaming, vedi AggregationMixin) o l'export.
+    """
+
+    def __init__(self, source: Callable[[], Iterator[Dict[str, Any]]], factory: type = DataSet, steps: tuple = (),
+                 origin: Optional[DataSet] = None):
+        # source: funzione che restituisce un *nuovo* iteratore di record ad ogni chiamata;
+        # origin: il dataset di ds.lazy(), i cui record finiscono nei risultati
+        self._source = source
+        self._factory = factory
+        self._steps = steps
+        self._origin = origin
+
+    def _with_step(self, kind: str, fn: Callable) -> 'LazyDataSet':
+        return type(self)(self._source, self._factory, self._steps + ((kind, fn),), self._origin)
+
+    def _result(self, rows: List[Dict[str, Any]]) -> DataSet:
+        ds = self._factory._trusted(rows)
+        return ds if self._origin is None else self._origin._share_rows(ds)
+
+    # ---------- Passi del piano ----------
+    def filter(self, predicate: Callable[[Dict[str, Any]], bool]) -> 'LazyDataSet':
+        return self._with_step("filter", predicate)
+
+    def map(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]]) -> 'LazyDataSet':
+        return self._with_step("map", transform)
+
+    def where(self, /, **equals: Any) -> 'LazyDataSet':
+        if not equals:
+            raise ValueError("Specificare almeno una condizione")
+        return self.filter(lambda r: all(_field_value(r, f) == v for f, v in equals.items()))
+
+    def where_between(self, field: str, low: Any, high: Any) -> 'LazyDataSet':
+        return self.filter(lambda r: low <= _field_value(r, field) <= high)
+
+    def join(self, other, on: Union[str, Tuple[str, ...]], how: str = "inner",
+             suffixes: Tuple[str, str] = ("_x", "_y")) -> 'LazyDataSet':
+        """
+        Join in streaming con una tabella (tipicamente piccola) other: solo other viene
+        tenuta in memoria, i record di questo piano la interrogano uno alla volta.
+        """
+        if how not in _JOIN_TYPES:
+            raise ValueError(f"Tipo di join sconosciuto: {how} (ammessi: {', '.join(_JOIN_TYPES)})")
+        return type(self)(lambda: _hash_join(iter(self), list(iter(other)), on, how, suffixes, probe_is_left=True),
+                          self._factory)
+
+    def sort_by(self, *fields: str, descending: Union[bool, List[bool]] = False,
+                run_size: int = 100_000) -> 'LazyDataSet':
+        """
+        Ordinamento con merge sort esterno: in memoria restano al più run_size record,
+        i blocchi ordinati vengono appoggiati su file temporanei e fusi in streaming.
+        """
+        desc = _sort_directions(fields, descending)
+        return type(self)(lambda: _external_sort(iter(self), fields, desc, run_size), self._factory)
+
+    def top_k(self, field: str, k: int) -> DataSet:
+        return self._result(heapq.nlargest(k, iter(self), key=lambda r: _field_value(r, field)))
+
+    def bottom_k(self, field: str, k: int) -> DataSet:
+        return self._result(heapq.nsmallest(k, iter(self), key=lambda r: _field_value(r, field)))
+
+    def explain(self) -> str:
+        """Descrizione testuale del piano dopo la fusione dei passi."""
+        lines = ["scan"]
+        for kind, fn, n in _fuse_steps(self._steps):
+            label = f"{kind}[{fn!r}]" if isinstance(fn, Expr) else kind
+            lines.append(f"{label} (x{n} fusi)" if n > 1 else label)
+        return " -> ".join(lines)
+
+    # ---------- Esecuzione ----------
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        stages = _fuse_steps(self._steps)
+        for r in self._source():
+            for kind, fn, _ in stages:
+                if kind == "filter":
+                    if not fn(r):
+                        break
+                else:
+                    for transform in fn:
+                        r = transform(r)
+                        if not isinstance(r, _RECORD_TYPES):
+                            raise TypeError("transform deve restituire un dict")
+            else:
+                yield r
+
+    def collect(self) -> DataSet:
+        # ogni record del piano è già un dict verificato (sorgente o map): costruttore trusted
+        return self._result(list(self))
+
+    def count(self) -> int:
+        """
+        Numero di record del piano, eseguendolo. Non c'è __len__: list(plan), sorted(plan)
+        e simili lo chiamerebbero per dimensionare il risultato, eseguendo il piano due volte.
+        """
+        return sum(1 for _ in self)
+
+    def reduce(self, func: Callable[[Any, Dict[str, Any]], Any], initial: Any) -> Any:
+        return _py_reduce(func, self, initial)
+
+    def group_by(self, key_or_fn: GroupKey) -> GroupBy:
+        return GroupBy(self, key_or_fn)
+
+    def _group_rows(self, key_or_fn: GroupKey) -> Dict[Any, DataSet]:
+        key_fn = _key_function(key_or_fn)
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for r in self:
+            groups.setdefault(key_fn(r), []).append(r)
+        return {k: self._result(v) for k, v in groups.items()}
+
+    def _group_factory(self, rows: List[Dict[str, Any]]) -> DataSet:
+        return self._factory._trusted(rows)
+
+
+# ======================
+#  ESECUZIONE PARALLELA
+# ======================
+
+# funzioni dei worker a livello di modulo: devono essere serializzabili per il pool di processi
+def _map_chunk(transform: Callable, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for r in rows:
+        tr = transform(r)
+        if not isinstance(tr, _RECORD_TYPES):
+            raise TypeError("transform deve restituire un dict")
+        out.append(tr)
+    return out
+
+
+def _filter_chunk(predicate: Callable, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [r for r in rows if predicate(r)]
+
+
+def _reduce_chunk(func: Callable, initial: Any, rows: List[Dict[str, Any]]) -> Any:
+    return _py_reduce(func, rows, initial)
+
+
+class ParallelDataSet:
+    """
+    Esecutore parallelo per un DataSet: i record vengono divisi in partizioni contigue,
+    elaborate da un pool di processi ("process") o thread ("thread"); i risultati sono
+    ricomposti nell'ordine originale.
+
+    Con backend="process" le funzioni devono essere picklable (definite a livello di
+    modulo, niente lambda). Un'eccezione in un worker viene rilanciata con il suo tipo
+    originale e una nota che indica la partizione che l'ha prodotta.
+    """
+
+    _BACKENDS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+    def __init__(self, source: DataSet, workers: Optional[int] = None, backend: str = "process",
+                 chunksize: Optional[int] = None):
+        if backend not in self._BACKENDS:
+            raise ValueError(f"Backend sconosciuto: {backend} (ammessi: {', '.join(self._BACKENDS)})")
+        self._source = source
+        self._workers = workers or os.cpu_count() or 1
+        self._backend = backend
+        self._chunksize = chunksize
+
+    def _partitions(self) -> List[List[Dict[str, Any]]]:
+        rows = list(self._source)
+        size = self._chunksize or max(1, math.ceil(len(rows) / (self._workers * 4)))
+        return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+    def _run(self, worker: Callable, *args: Any) -> List[Any]:
+        if self._backend == "process":
+            for fn in args:
+                try:
+                    pickle.dumps(fn)
+                except (pickle.PicklingError, AttributeError, TypeError) as exc:
+                    raise TypeError("Con backend='process' le funzioni devono essere picklable "
+                                    "(definite a livello di modulo); per le lambda usa backend='thread'") from exc
+        parts = self._partitions()
+        with self._BACKENDS[self._backend](max_workers=self._workers) as pool:
+            futures = [pool.submit(worker, *args, part) for part in parts]
+            results = []
+            for i, fut in enumerate(futures):
+                try:
+                    results.append(fut.result())
+                except Exception as exc:
+                    for other in futures[i + 1:]:
+                        other.cancel()
+                    exc.add_note(f"Errore nel worker della partizione {i + 1}/{len(parts)} ({len(parts[i])} record)")
+                    raise
+        return results
+
+    def _result(self, parts: List[List[Dict[str, Any]]], schema: Optional[Schema] = None) -> DataSet:
+        ds = type(self._source)._trusted([r for part in parts for r in part], schema)
+        # con i thread i record restano gli stessi oggetti della sorgente
+        return self._source._share_rows(ds) if self._backend == "thread" else ds
+
+    def map(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]]) -> DataSet:
+        return self._result(self._run(_map_chunk, transform))
+
+    def filter(self, predicate: Callable[[Dict[str, Any]], bool]) -> DataSet:
+        return self._result(self._run(_filter_chunk, predicate), getattr(self._source, "_schema", None))
+
+    def reduce(self, func: Callable[[Any, Dict[str, Any]], Any], initial: Any,
+               combine: Callable[[Any, Any], Any]) -> Any:
+        """
+        Riduce ogni partizione partendo da initial, poi combina i parziali ad albero
+        (a coppie adiacenti, preservando l'ordine). combine deve essere associativa e
+        initial il suo elemento neutro, es. reduce(somma_salario, 0.0, operator.add).
+        """
+        partials = self._run(_reduce_chunk, func, initial)
+        if not partials:
+            return initial
+        while len(partials) > 1:
+            paired = [combine(partials[i], partials[i + 1]) for i in range(0, len(partials) - 1, 2)]
+            if len(partials) % 2:
+                paired.append(partials[-1])
+            partials = paired
+        return partials[0]
+
+
+# ======================
+#    ISTRUMENTAZIONE
+# ======================
+
+@dataclass
+class TraceEvent:
+    name: str
+    rows_in: Optional[int]
+    rows_out: Optional[int]
+    start: float  # secondi da time.perf_counter()
+    seconds: float
+    bytes: Optional[int]  # picco di memoria allocata durante l'operazione (solo con memory=True)
+    depth: int
+    thread: int
+
+
+class Trace:
+    """Operazioni registrate dentro un blocco `with trace() as t:`."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.events: List[TraceEvent] = []
+        self._local = threading.local()
+
+    def _open(self) -> List[list]:
+        # operazioni in corso nel thread corrente: [(nome metodo, id oggetto), picco salvato]
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def table(self) -> str:
+        lines = [f"{'operazione':<40} {'righe in':>10} {'righe out':>10} {'ms':>10} {'KB':>10}"]
+        for e in sorted(self.events, key=lambda e: e.start):
+            cells = ["-" if v is None else f"{v:,}" for v in (e.rows_in, e.rows_out)]
+            kb = "-" if e.bytes is None else f"{e.bytes / 1024:,.1f}"
+            lines.append(f"{'  ' * e.depth + e.name:<40} {cells[0]:>10} {cells[1]:>10} "
+                         f"{e.seconds * 1000:>10.3f} {kb:>10}")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self, path: str) -> None:
+        """Scrive gli eventi nel formato Trace Event di Chrome (chrome://tracing, Perfetto)."""
+        origin = min((e.start for e in self.events), default=0.0)
+        events = [{"name": e.name, "cat": "dataset", "ph": "X", "pid": os.getpid(), "tid": e.thread,
+                   "ts": (e.start - origin) * 1e6, "dur": e.seconds * 1e6,
+                   "args": {"rows_in": e.rows_in, "rows_out": e.rows_out, "bytes": e.bytes}}
+                  for e in self.events]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+_TRACE: Optional[Trace] = None
+
+
+class trace:
+    """
+    Context manager che registra ogni operazione del framework eseguita nel blocco:
+
+        with trace(memory=True) as t:
+            ds.filter(...).group_by("city").agg(salary="mean")
+        print(t.table()); t.to_chrome_trace("trace.json")
+
+    Fuori dal blocco i metodi strumentati costano solo un controllo in più.
+    memory=True usa tracemalloc, che rallenta sensibilmente l'esecuzione; il picco è
+    misurato per processo, quindi con più thread attivi include le loro allocazioni.
+    """
+
+    def __init__(self, memory: bool = False):
+        self._trace = Trace(memory)
+        self._previous: Optional[Trace] = None
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> Trace:
+        global _TRACE
+        self._previous, _TRACE = _TRACE, self._trace
+        if self._trace.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self._trace
+
+    def __exit__(self, *exc) -> None:
+        global _TRACE
+        _TRACE = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+
+def _row_count(obj: Any) -> Optional[int]:
+    # solo conteggi O(1): i piani pigri non vengono eseguiti per contarli
+    return len(obj) if isinstance(obj, DataSet) else None
+
+
+def _traced(fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        t = _TRACE
+        if t is None:
+            return fn(self, *args, **kwargs)
+        token = (fn.__name__, id(self))
+        stack = t._open()
+        if stack and stack[-1][0] == token:  # super().metodo(): già registrato dal chiamante
+            return fn(self, *args, **kwargs)
+        owner = self if isinstance(self, type) else type(self)
+        rows_in = _row_count(self._source if isinstance(self, (GroupBy, ParallelDataSet)) else self)
+        frame = [token, 0]
+        if t.memory:
+            base, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # reset_peak() azzera anche il picco dell'operazione esterna: lo conserva il suo frame
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            result = fn(self, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+        allocated = None
+        if t.memory:
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            allocated = peak - base
+        t.events.append(TraceEvent(f"{owner.__name__}.{fn.__name__}", rows_in, _row_count(result),
+                                   start, seconds, allocated, len(stack), threading.get_ident()))
+        return result
+    return wrapper
+
+
+def _instrument(cls: type, names: List[str]) -> None:
+    """Avvolge con _traced i metodi (anche classmethod) definiti direttamente in cls."""
+    for name in names:
+        attr = cls.__dict__.get(name)
+        if isinstance(attr, classmethod):
+            setattr(cls, name, classmethod(_traced(attr.__func__)))
+        elif attr is not None:
+            setattr(cls, name, _traced(attr))
+
+
+_instrument(AggregationMixin, ["agg", "sum", "mean", "min", "max", "var", "std", "quantile", "sketch"])
+_instrument(WindowMixin, ["rolling", "cumulative"])
+_instrument(IndexMixin, ["create_index", "where", "where_between"])
+_instrument(GroupBy, ["agg"])
+_instrument(DataSet, ["filter", "map", "reduce", "group_by", "sort_by", "top_k", "bottom_k", "join",
+                      "to_columnar", "read_csv", "read_jsonl", "open_columnar"])
+_instrument(ColumnarDataSet, ["filter", "map", "reduce", "to_rows", "to_columnar", "open_columnar"])
+_instrument(AppendableDataSet, ["extend", "track", "track_groups", "agg"])
+_instrument(ExportJSONMixin, ["export_json"])
+_instrument(ExportCSVMixin, ["export_csv"])
+_instrument(ExportStreamMixin, ["export_jsonl", "export_csv_stream"])
+_instrument(ExportColumnarMixin, ["export_columnar"])
+_instrument(LazyDataSet, ["collect", "reduce", "group_by", "top_k", "bottom_k"])
+_instrument(ParallelDataSet, ["map", "filter", "reduce"])
+
+
 # ======================
 #   IMPLEMENTAZIONE FINALE
 # ======================
 
-class ExportableDataSet(ExportJSONMixin, ExportCSVMixin, DataSet):
+class ExportableDataSet(ExportJSONMixin, ExportCSVMixin, ExportStreamMixin, ExportColumnarMixin, DataSet):
+    pass
+
+
+class ExportableColumnarDataSet(ExportJSONMixin, ExportCSVMixin, ExportStreamMixin, ExportColumnarMixin,
+                                ColumnarDataSet):
+    pass
+
+
+class ExportableAppendableDataSet(ExportJSONMixin, ExportCSVMixin, ExportStreamMixin, ExportColumnarMixin,
+                                  AppendableDataSet):
     pass
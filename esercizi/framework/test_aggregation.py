@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Test delle aggregazioni in una sola passata (agg, sum, mean, quantili).
+
+Esecuzione:
+    python -m unittest test_aggregation -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet
+from fram_fixtures import _sample
+
+
+class AggregationTests(unittest.TestCase):
+    def test_agg_single_pass(self):
+        res = DataSet(_sample()).agg(salary=["sum", "mean", "min", "max"], age="count")
+        self.assertEqual(res["salary"], {"sum": 13100.0, "mean": 3275.0, "min": 2800.0, "max": 4100.0})
+        self.assertEqual(res["age"], {"count": 4})
+
+    def test_quantile_and_std(self):
+        ds = DataSet(_sample())
+        self.assertEqual(ds.quantile("age", 0.5), 27.0)
+        self.assertAlmostEqual(ds.var("age"), 64.25)
+        self.assertAlmostEqual(ds.std("age") ** 2, 64.25)
+
+    def test_single_statistics(self):
+        ds = DataSet(_sample())
+        self.assertEqual((ds.sum("salary"), ds.mean("salary")), (13100.0, 3275.0))
+        self.assertEqual((ds.min("age"), ds.max("age")), (24.0, 41.0))
+        self.assertIsInstance(ds.sum("age"), float)
+        self.assertEqual(ColumnarDataSet(_sample()).sum("age"), 119.0)
+
+    def test_count_accepts_any_type(self):
+        rows = _sample() + [{"name": None, "age": 50, "city": "Bari", "salary": 1.0}]
+        self.assertEqual(DataSet(rows).agg(name="count"), {"name": {"count": 4}})
+        self.assertEqual(ColumnarDataSet(rows).agg(name="count", city="count"),
+                         {"name": {"count": 4}, "city": {"count": 5}})
+        with self.assertRaises(TypeError):
+            DataSet(rows).agg(name=["count", "max"])
+
+    def test_errors(self):
+        ds = DataSet(_sample())
+        with self.assertRaises(TypeError):
+            ds.sum("name")
+        with self.assertRaises(TypeError):
+            ds.max("city")
+        with self.assertRaises(ValueError):
+            ds.mean("bonus")
+        with self.assertRaises(ValueError):
+            ds.agg(salary="mode")
+
+
+if __name__ == "__main__":
+    unittest.main()
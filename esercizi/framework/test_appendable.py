@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Test del dataset incrementale (AppendableDataSet).
+
+Esecuzione:
+    python -m unittest test_appendable -v
+"""
+
+import unittest
+
+from soluzioneFram import AppendableDataSet
+from fram_fixtures import _sample
+
+
+class AppendableTests(unittest.TestCase):
+    def test_tracked_aggregates_follow_appends(self):
+        ds = AppendableDataSet(_sample())
+        ds.track(salary=["sum", "mean"])
+        ds.track_groups("city", n="count", salary="max")
+        ds.append({"name": "Eva", "age": 35, "city": "Rome", "salary": 5000.0})
+        self.assertEqual(ds.sum("salary"), 18100.0)
+        self.assertEqual(ds.mean("salary"), 3620.0)
+        self.assertEqual(list(ds.group_by("city").agg(n="count", salary="max"))[0],
+                         {"city": "Rome", "n": 3, "salary": 5000.0})
+
+    def test_tracked_aggregates_follow_getitem_changes(self):
+        ds = AppendableDataSet(_sample())
+        ds.track(salary="sum")
+        ds.track_groups("city", top=("salary", "max"))
+        ds[0]["salary"] = 5000.0
+        self.assertEqual(ds.sum("salary"), 14900.0)
+        self.assertEqual(ds.group_by("city").agg(top=("salary", "max"))[0]["top"], 5000.0)
+        ds.append({"name": "Eva", "age": 35, "city": "Rome", "salary": 1.0})
+        self.assertEqual(ds.sum("salary"), 14901.0)
+
+    def test_list_and_tuple_group_specs_are_different(self):
+        ds = AppendableDataSet(_sample())
+        ds.track_groups("city", top=("salary", "max"))
+        with self.assertRaises(ValueError):  # campo 'top' con aggregazioni 'salary' e 'max'
+            ds.group_by("city").agg(top=["salary", "max"])
+
+    def test_failed_extend_leaves_state_unchanged(self):
+        ds = AppendableDataSet(_sample())
+        ds.track(salary="sum")
+        with self.assertRaises(TypeError):
+            ds.extend([{"name": "X", "age": 1, "city": "Rome", "salary": "n/a"}])
+        self.assertEqual((len(ds), ds.sum("salary")), (4, 13100.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Test del confronto tra esecuzioni di benchmark.py.
+
+Esecuzione:
+    python -m unittest test_benchmark -v
+"""
+
+import contextlib
+import io
+import unittest
+
+
+class BenchmarkCompareTests(unittest.TestCase):
+    def _results(self, seconds, peak=None):
+        entry = {"seconds": seconds, "rows_per_sec": 1.0}
+        if peak is not None:
+            entry["peak_bytes"] = peak
+        return {"results": {"10k": {"sum": entry}}}
+
+    def test_time_and_memory_regressions(self):
+        import benchmark
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(benchmark.compare(self._results(1.05, 100), self._results(1.0, 100), 0.10), [])
+            slow = benchmark.compare(self._results(2.0, 100), self._results(1.0, 100), 0.10)
+            fat = benchmark.compare(self._results(1.0, 300), self._results(1.0, 100), 0.10)
+            no_memory = benchmark.compare(self._results(1.0), self._results(1.0, 100), 0.10)
+        self.assertEqual(slow, ["10k/sum: tempo 2.00x rispetto alla baseline"])
+        self.assertEqual(fat, ["10k/sum: memoria 3.00x rispetto alla baseline"])
+        self.assertEqual(no_memory, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Test della cache dei risultati.
+
+Esecuzione:
+    python -m unittest test_cache -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet
+from fram_fixtures import _sample
+
+
+class CacheTests(unittest.TestCase):
+    def test_hits_and_misses(self):
+        ds = DataSet(_sample())
+        ds.enable_cache(maxsize=2)
+        ds.sum("salary")
+        ds.sum("salary")
+        ds.group_by("city").agg(n="count")
+        ds.group_by("city").agg(n="count")
+        len(ds.group_by("city"))
+        len(ds.group_by("city"))
+        info = ds.cache_info()
+        self.assertEqual((info.hits, info.maxsize), (3, 2))
+        self.assertLessEqual(info.currsize, 2)
+
+    def test_getitem_invalidates(self):
+        ds = DataSet(_sample())
+        ds.enable_cache()
+        self.assertEqual(ds.sum("salary"), 13100.0)
+        ds[0]["salary"] = 0.0
+        self.assertEqual(ds.sum("salary"), 9900.0)
+        self.assertEqual(ds.cache_info().invalidations, 1)
+
+    def test_change_through_derived_dataset_invalidates_parent(self):
+        ds = DataSet(_sample())
+        ds.enable_cache()
+        self.assertEqual(ds.sum("salary"), 13100.0)
+        ds.filter(lambda r: True)[0]["salary"] = 0.0
+        self.assertEqual(ds.sum("salary"), 9900.0)
+        ds.group_by("city")["Turin"][0]["salary"] = 0.0
+        self.assertEqual(ds.sum("salary"), 5800.0)
+        child = ds.top_k("salary", 2)
+        child.enable_cache()
+        self.assertEqual(child.sum("salary"), 5800.0)
+        ds[1]["salary"] = 0.0
+        self.assertEqual(child.sum("salary"), 3000.0)
+
+    def test_cached_results_are_copies(self):
+        ds = DataSet(_sample())
+        ds.enable_cache()
+        ds.agg(salary="sum")["salary"]["sum"] = -1
+        self.assertEqual(ds.agg(salary="sum"), {"salary": {"sum": 13100.0}})
+
+    def test_cached_group_results_are_copies(self):
+        ds = DataSet(_sample())
+        ds.enable_cache()
+        res = ds.group_by("city").agg(n="count")
+        res[0]["n"] = 99
+        self.assertEqual(ds.group_by("city").agg(n="count")[0]["n"], 2)
+        self.assertIsNot(ds.group_by("city").agg(n="count"), ds.group_by("city").agg(n="count"))
+        groups = ds.group_by("city")
+        dict(groups)
+        self.assertEqual(ds.cache_info().hits, 3)
+        self.assertIsNot(groups, ds.group_by("city"))
+        self.assertEqual(sorted(ds.group_by("city")), ["Milan", "Rome", "Turin"])
+
+    def test_list_and_tuple_specs_are_different_keys(self):
+        ds = DataSet(_sample())
+        ds.enable_cache()
+        self.assertEqual(ds.group_by("city").agg(top=("salary", "max"))[0], {"city": "Rome", "top": 3200.0})
+        with self.assertRaises(ValueError):  # campo 'top' con aggregazioni 'salary' e 'max'
+            ds.group_by("city").agg(top=["salary", "max"])
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(DataSet(_sample()).cache_info())
+
+
+if __name__ == "__main__":
+    unittest.main()
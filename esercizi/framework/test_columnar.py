@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Test del formato colonnare (ColumnarDataSet).
+
+Esecuzione:
+    python -m unittest test_columnar -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet, Schema, col
+from fram_fixtures import _SAMPLE, _sample
+
+
+class ColumnarTests(unittest.TestCase):
+    def test_roundtrip_and_types(self):
+        ds = ColumnarDataSet(_sample())
+        self.assertEqual(len(ds), 4)
+        self.assertEqual(list(ds), _SAMPLE)
+        self.assertEqual(ds[-1]["name"], "Diego")
+        self.assertEqual(ds.column("age").typecode, "q")
+        self.assertEqual(ds.column("salary").typecode, "d")
+        self.assertEqual((ds.schema["age"], ds.schema["salary"]), (int, float))
+
+    def test_declared_schema_is_respected(self):
+        schema = Schema({"a": float, "b": int}, nullable=["b"])
+        ds = ColumnarDataSet([{"a": 1, "b": 2}, {"a": 2.5, "b": None}], schema=schema)
+        self.assertIs(ds.schema, schema)
+        self.assertEqual(ds.column("a").typecode, "d")
+        self.assertEqual(list(ds)[0], {"a": 1.0, "b": 2})
+        self.assertIsInstance(ds[0]["a"], float)
+        self.assertEqual(ds.filter(col("a") > 1).schema, schema)
+        with self.assertRaises(TypeError):
+            ColumnarDataSet([{"a": "x", "b": 1}], schema=schema)
+
+    def test_rows_are_copies(self):
+        ds = ColumnarDataSet(_sample())
+        ds[0]["salary"] = 0.0
+        self.assertEqual(ds.sum("salary"), 13100.0)
+
+    def test_operations_match_row_storage(self):
+        rows, cols = DataSet(_sample()), ColumnarDataSet(_sample())
+        self.assertEqual(list(cols.filter(lambda r: r["age"] >= 30)), list(rows.filter(lambda r: r["age"] >= 30)))
+        self.assertEqual(cols.mean("salary"), rows.mean("salary"))
+        self.assertEqual(list(cols.to_rows()), _SAMPLE)
+
+    def test_requires_uniform_fields(self):
+        with self.assertRaises(ValueError):
+            ColumnarDataSet([{"a": 1}, {"b": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()
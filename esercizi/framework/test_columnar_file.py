@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Test del formato colonnare su file.
+
+Esecuzione:
+    python -m unittest test_columnar_file -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet, ExportableDataSet, ExportableColumnarDataSet
+from fram_fixtures import _SAMPLE, _sample, _TempDirMixin
+
+
+class ColumnarFileTests(_TempDirMixin, unittest.TestCase):
+    def test_export_and_open(self):
+        ds = ExportableColumnarDataSet(_sample())
+        ds.export_columnar(self.path("data.col"))
+        opened = DataSet.open_columnar(self.path("data.col"))
+        self.assertIsInstance(opened, ColumnarDataSet)
+        self.assertEqual(list(opened), _SAMPLE)
+        self.assertEqual(opened.sum("salary"), 13100.0)
+
+    def test_rows_dataset_exports_too(self):
+        ExportableDataSet(_sample()).export_columnar(self.path("data.col"))
+        self.assertEqual(list(ColumnarDataSet.open_columnar(self.path("data.col"))), _SAMPLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
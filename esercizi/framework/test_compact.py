@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Test dei record compatti (CompactRow).
+
+Esecuzione:
+    python -m unittest test_compact -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet, CompactRow
+from fram_fixtures import _SAMPLE, _SCHEMA, _sample
+
+
+class CompactRowTests(unittest.TestCase):
+    def test_compact_rows_are_read_only_mappings(self):
+        ds = DataSet(_sample()).compact()
+        self.assertIsInstance(ds[0], CompactRow)
+        self.assertEqual(dict(ds[0]), _SAMPLE[0])
+        with self.assertRaises(TypeError):
+            ds[0]["age"] = 1
+        self.assertEqual(ds.group_by("city").agg(n="count")[0]["n"], 2)
+
+    def test_schema_only_validates(self):
+        ds = DataSet(_sample(), schema=_SCHEMA)
+        self.assertIsInstance(ds[0], dict)
+        ds[0]["age"] = 31
+        self.assertEqual(ds[0]["age"], 31)
+        compact = ds.compact()
+        self.assertIsInstance(compact[0], CompactRow)
+        self.assertIs(compact.schema, _SCHEMA)
+        self.assertEqual(list(compact.map(lambda r: {**r, "x": 1}))[0]["x"], 1)
+
+    def test_columnar_is_already_compact(self):
+        ds = ColumnarDataSet(_sample())
+        self.assertIs(ds.compact(), ds)
+
+    def test_pickle_roundtrip(self):
+        import pickle
+        row = DataSet(_sample()).compact()[0]
+        self.assertEqual(pickle.loads(pickle.dumps(row)), row)
+
+    def test_compact_requires_uniform_fields(self):
+        with self.assertRaises(ValueError):
+            DataSet([{"a": 1}, {"b": 2}]).compact()
+
+
+if __name__ == "__main__":
+    unittest.main()
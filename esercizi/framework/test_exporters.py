@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Test degli esportatori CSV/JSON.
+
+Esecuzione:
+    python -m unittest test_exporters -v
+"""
+
+import os
+import unittest
+
+from soluzioneFram import DataSet, ExportableDataSet
+from fram_fixtures import _SAMPLE, _sample, _TempDirMixin
+
+
+class ExporterTests(_TempDirMixin, unittest.TestCase):
+    def test_jsonl_roundtrip_with_gzip(self):
+        ds = ExportableDataSet(_sample())
+        stats = ds.export_jsonl(self.path("out.jsonl.gz"), batch_size=3)
+        self.assertEqual(stats.rows, 4)
+        self.assertGreater(stats.bytes, 0)
+        import gzip, json
+        with gzip.open(self.path("out.jsonl.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual([json.loads(line) for line in f], _SAMPLE)
+
+    def test_csv_stream(self):
+        ds = ExportableDataSet(_sample())
+        stats = ds.export_csv_stream(self.path("out.csv"))
+        self.assertEqual(stats.rows, 4)
+        self.assertEqual(list(DataSet.read_csv(self.path("out.csv"))), _SAMPLE)
+
+    def test_csv_stream_extrasaction(self):
+        ds = ExportableDataSet(_sample())
+        with self.assertRaises(ValueError):
+            ds.export_csv_stream(self.path("out.csv"), extrasaction="skip")
+        self.assertFalse(os.path.exists(self.path("out.csv")))
+        with self.assertRaises(ValueError):
+            ds.export_csv_stream(self.path("out.csv"), fieldnames=["name"])
+        ds.export_csv_stream(self.path("out.csv"), fieldnames=["name"], extrasaction="ignore")
+        self.assertEqual([r["name"] for r in DataSet.read_csv(self.path("out.csv"))], [r["name"] for r in _SAMPLE])
+
+
+if __name__ == "__main__":
+    unittest.main()
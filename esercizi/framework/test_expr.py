@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Test delle espressioni sulle colonne (col).
+
+Esecuzione:
+    python -m unittest test_expr -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet, Expr, col
+from fram_fixtures import _sample
+
+
+class ExprTests(unittest.TestCase):
+    def test_row_and_columnar_agree(self):
+        expr = (col("age") >= 24) & ~(col("city") == "Milan") | col("salary").between(4000, 5000)
+        self.assertEqual(list(DataSet(_sample()).filter(expr)), list(ColumnarDataSet(_sample()).filter(expr)))
+        self.assertEqual(len(DataSet(_sample()).filter(col("city").isin(["Rome", "Turin"]))), 3)
+
+    def test_indexed_filter(self):
+        ds = DataSet(_sample())
+        ds.create_index("age", kind="sorted")
+        self.assertEqual([r["name"] for r in ds.filter((col("age") > 24) & (col("city") == "Rome"))], ["Alice"])
+
+    def test_indexed_filter_after_change(self):
+        ds = DataSet(_sample())
+        ds.create_index("city")
+        self.assertEqual(len(ds.filter(col("city") == "Rome")), 2)
+        ds[0]["city"] = "Naples"
+        self.assertEqual([r["name"] for r in ds.filter(col("city") == "Naples")], ["Alice"])
+        ds.filter(col("age") > 0)[1]["city"] = "Naples"
+        self.assertEqual(len(ds.filter(col("city") == "Naples")), 2)
+
+    def test_mismatched_types_raise_type_error(self):
+        for ds in (DataSet(_sample()), ColumnarDataSet(_sample())):
+            with self.assertRaises(TypeError) as ctx:
+                ds.filter(col("age") > "30")
+            self.assertEqual(str(ctx.exception), "'>' not supported between instances of 'int' and 'str'")
+
+    def test_no_python_boolean_ops(self):
+        with self.assertRaises(TypeError):
+            (col("age") > 1) and (col("age") < 5)
+
+    def test_expr_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Expr()
+
+        class RowOnly(Expr):
+            def eval_row(self, r):
+                return True
+        with self.assertRaises(TypeError):
+            RowOnly()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Test di group_by e delle aggregazioni per gruppo.
+
+Esecuzione:
+    python -m unittest test_groupby -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet, LazyDataSet
+from fram_fixtures import _sample
+
+
+class GroupByTests(unittest.TestCase):
+    def test_mapping_of_groups(self):
+        groups = DataSet(_sample()).group_by("city")
+        self.assertEqual(list(groups), ["Rome", "Milan", "Turin"])
+        self.assertEqual(len(groups["Rome"]), 2)
+
+    def test_agg_named_outputs(self):
+        res = DataSet(_sample()).group_by("city").agg(salary="mean", n="count", top=("age", "max"))
+        self.assertEqual(list(res)[0], {"city": "Rome", "salary": 3100.0, "n": 2, "top": 30.0})
+
+    def test_composite_and_callable_keys(self):
+        ds = DataSet(_sample())
+        res = ds.group_by(("city", "age")).agg(n="count")
+        self.assertEqual(len(res), 4)
+        res = ds.group_by(lambda r: r["age"] >= 30).agg(salary=["min", "max"])
+        self.assertEqual(list(res)[1], {"key": False, "salary_min": 2800.0, "salary_max": 3000.0})
+
+    def test_agg_edge_cases(self):
+        rows = _sample() + [{"name": None, "age": 50, "city": "Rome", "salary": 1000.0}]
+        res = DataSet(rows).group_by(("city",)).agg(names=("name", "count"), n="count", salary=["mean", "max"])
+        self.assertEqual(list(res)[0], {"city": "Rome", "names": 2, "n": 3, "salary_mean": 2400.0,
+                                        "salary_max": 3200.0})
+        lazy = LazyDataSet(lambda: iter(_sample())).filter(lambda r: r["age"] < 40)
+        self.assertEqual(list(lazy.group_by("city").agg(salary="sum")),
+                         [{"city": "Rome", "salary": 6200.0}, {"city": "Milan", "salary": 2800.0}])
+        with self.assertRaises(ValueError):
+            DataSet(_sample()).group_by("city").agg(bonus="sum")
+        with self.assertRaises(TypeError):
+            DataSet(_sample()).group_by("city").agg(name="max")
+
+    def test_columnar_matches_rows(self):
+        spec = dict(salary="sum", n="count")
+        self.assertEqual(list(ColumnarDataSet(_sample()).group_by("city").agg(**spec)),
+                         list(DataSet(_sample()).group_by("city").agg(**spec)))
+
+
+if __name__ == "__main__":
+    unittest.main()
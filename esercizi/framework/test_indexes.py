@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Test degli indici secondari.
+
+Esecuzione:
+    python -m unittest test_indexes -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet
+from fram_fixtures import _sample
+
+
+class IndexTests(unittest.TestCase):
+    def test_where_with_and_without_index(self):
+        ds = DataSet(_sample())
+        plain = list(ds.where(city="Rome", age=24))
+        ds.create_index("city")
+        self.assertEqual(list(ds.where(city="Rome", age=24)), plain)
+        self.assertEqual([r["name"] for r in plain], ["Cecilia"])
+
+    def test_sorted_index_range(self):
+        ds = ColumnarDataSet(_sample())
+        ds.create_index("age", kind="sorted")
+        self.assertEqual([r["name"] for r in ds.where_between("age", 24, 30)], ["Alice", "Bob", "Cecilia"])
+        self.assertEqual(ds.indexes(), {"age": "sorted"})
+
+    def test_derived_datasets_inherit_definitions(self):
+        ds = DataSet(_sample())
+        ds.create_index("city")
+        child = ds.filter(lambda r: r["age"] < 40)
+        self.assertEqual(child.indexes(), {"city": "hash"})
+        self.assertEqual(len(child.where(city="Rome")), 2)
+
+    def test_refresh_after_in_place_change(self):
+        ds = DataSet(_sample())
+        ds.create_index("city")
+        for r in ds:
+            r["city"] = "Naples"
+        ds.refresh_indexes()
+        self.assertEqual(len(ds.where(city="Naples")), 4)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            DataSet(_sample()).create_index("city", kind="btree")
+
+    def test_getitem_resets_built_indexes(self):
+        ds = DataSet(_sample())
+        ds.create_index("city")
+        ds[0]["city"] = "Naples"
+        self.assertEqual([r["name"] for r in ds.where(city="Naples")], ["Alice"])
+        self.assertEqual(len(ds.where(city="Rome")), 1)
+
+    def test_read_only_access_keeps_indexes_and_cache(self):
+        ds = DataSet(_sample())
+        ds.create_index("city")
+        ds.enable_cache()
+        ds.sum("salary")
+        built = ds.where(city="Rome")
+        names = [ds.row(i)["name"] for i in range(len(ds))]
+        self.assertEqual(names, ["Alice", "Bob", "Cecilia", "Diego"])
+        with self.assertRaises(TypeError):
+            ds.row(0)["city"] = "Naples"
+        compact = ds.compact()
+        compact.enable_cache()
+        compact.sum("salary")
+        compact[0]
+        compact.sum("salary")
+        self.assertEqual(compact.cache_info().invalidations, 0)
+        ds.sum("salary")
+        self.assertEqual((ds.cache_info().hits, ds.cache_info().invalidations), (1, 0))
+        self.assertEqual(list(ds.where(city="Rome")), list(built))
+        self.assertEqual(ColumnarDataSet(_sample()).row(1)["name"], "Bob")
+
+    def test_change_through_derived_dataset(self):
+        ds = DataSet(_sample())
+        ds.create_index("city", kind="sorted")
+        child = ds.filter(lambda r: r["age"] < 40)
+        self.assertEqual(len(child.where(city="Rome")), 2)
+        child[0]["city"] = "Naples"  # stesso oggetto record di ds[0]
+        self.assertEqual(len(ds.where(city="Naples")), 1)
+        ds.sort_by("age")[0]["city"] = "Bari"  # Bob, condiviso con child
+        self.assertEqual([r["name"] for r in child.where(city="Bari")], ["Bob"])
+        ds.lazy().collect()[3]["city"] = "Genoa"
+        self.assertEqual(len(ds.where(city="Genoa")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Test del hash join.
+
+Esecuzione:
+    python -m unittest test_join -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet
+from fram_fixtures import _sample
+
+
+class JoinTests(unittest.TestCase):
+    def setUp(self):
+        self.depts = DataSet([{"city": "Rome", "region": "Lazio"}, {"city": "Milan", "region": "Lombardia"},
+                              {"city": "Bari", "region": "Puglia"}])
+
+    def test_inner_and_left(self):
+        ds = DataSet(_sample())
+        self.assertEqual([r["region"] for r in ds.join(self.depts, on="city")], ["Lazio", "Lombardia", "Lazio"])
+        left = ds.join(self.depts, on="city", how="left")
+        self.assertEqual(left[3]["region"], None)
+
+    def test_left_join_keeps_left_order_when_left_is_smaller(self):
+        left = DataSet([{"city": "Bari", "n": 1}, {"city": "Genoa", "n": 2}, {"city": "Rome", "n": 3}])
+        other = DataSet(_sample())
+        rows = left.join(other, on="city", how="left")
+        self.assertEqual([(r["n"], r["name"]) for r in rows], [(1, None), (2, None), (3, "Alice"), (3, "Cecilia")])
+        outer = left.join(other, on="city", how="outer")
+        self.assertEqual([r["n"] for r in outer][:4], [1, 2, 3, 3])
+
+    def test_outer_and_suffixes(self):
+        other = DataSet([{"city": "Rome", "salary": 1.0}])
+        out = DataSet(_sample()).join(other, on="city", how="outer")
+        self.assertEqual(len(out), 4)
+        self.assertIn("salary_x", out[0])
+        self.assertEqual(len(DataSet(_sample()).join(self.depts, on="city", how="outer")), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
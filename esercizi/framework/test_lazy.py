@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Test del piano di esecuzione pigro (LazyDataSet).
+
+Esecuzione:
+    python -m unittest test_lazy -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, LazyDataSet, col
+from fram_fixtures import _sample, _salary_sum
+
+
+class LazyPlanTests(unittest.TestCase):
+    def test_steps_are_deferred_and_fused(self):
+        seen = []
+
+        def source():
+            for r in _sample():
+                seen.append(r["name"])
+                yield r
+        plan = LazyDataSet(source).filter(lambda r: r["age"] > 20).filter(lambda r: r["city"] == "Rome") \
+            .map(lambda r: {**r, "k": 1})
+        self.assertEqual(seen, [])
+        self.assertIn("x2 fusi", plan.explain())
+        self.assertEqual([r["name"] for r in plan.collect()], ["Alice", "Cecilia"])
+        self.assertEqual(len(seen), 4)  # una sola passata
+        seen.clear()
+        self.assertEqual(plan.top_k("salary", 1)[0]["name"], "Alice")
+        self.assertEqual(len(seen), 4)
+
+    def test_terminal_operations(self):
+        plan = DataSet(_sample()).lazy().filter(col("city") == "Rome")
+        self.assertEqual(plan.count(), 2)
+        self.assertEqual(plan.sum("salary"), 6200.0)
+        self.assertEqual(plan.reduce(_salary_sum, 0.0), 6200.0)
+
+    def test_builtins_execute_the_plan_once(self):
+        runs = []
+
+        def source():
+            runs.append(1)
+            return iter(_sample())
+        plan = LazyDataSet(source).filter(lambda r: r["age"] < 40)
+        self.assertEqual(len(list(plan)), 3)
+        self.assertEqual(len(sorted(plan, key=lambda r: r["age"])), 3)
+        self.assertEqual(len(tuple(plan)), 3)
+        self.assertEqual(len(runs), 3)
+        self.assertEqual(len(DataSet(_sample()).join(plan, on="name")), 3)
+        self.assertEqual(len(runs), 4)
+        with self.assertRaises(TypeError):
+            len(plan)
+
+    def test_map_must_return_dict(self):
+        with self.assertRaises(TypeError):
+            DataSet(_sample()).lazy().map(lambda r: 1).collect()
+
+
+if __name__ == "__main__":
+    unittest.main()
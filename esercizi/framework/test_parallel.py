@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Test dell'esecuzione parallela (ParallelDataSet).
+
+Esecuzione:
+    python -m unittest test_parallel -v
+"""
+
+import operator
+import unittest
+
+from soluzioneFram import DataSet
+from fram_fixtures import _SAMPLE, _sample, _salary_sum, _is_roman
+
+
+class ParallelTests(unittest.TestCase):
+    def test_thread_backend_preserves_order(self):
+        par = DataSet(_sample()).parallel(workers=2, backend="thread", chunksize=1)
+        self.assertEqual([r["name"] for r in par.map(lambda r: {**r, "x": 1})], [r["name"] for r in _SAMPLE])
+        self.assertEqual(len(par.filter(_is_roman)), 2)
+        self.assertEqual(par.reduce(_salary_sum, 0.0, operator.add), 13100.0)
+
+    def test_process_backend(self):
+        par = DataSet(_sample()).parallel(workers=2, backend="process")
+        self.assertEqual(par.reduce(_salary_sum, 0.0, operator.add), 13100.0)
+
+    def test_process_backend_rejects_lambdas(self):
+        with self.assertRaises(TypeError):
+            DataSet(_sample()).parallel(workers=2).filter(lambda r: True)
+
+    def test_worker_error_keeps_type(self):
+        par = DataSet(_sample()).parallel(workers=2, backend="thread", chunksize=2)
+        with self.assertRaises(KeyError):
+            par.filter(lambda r: r["missing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Test della lettura in streaming di CSV e JSON Lines.
+
+Esecuzione:
+    python -m unittest test_readers -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, Schema
+from fram_fixtures import _TempDirMixin
+
+
+class ReaderTests(_TempDirMixin, unittest.TestCase):
+    def _write(self, name, text):
+        with open(self.path(name), "w", encoding="utf-8") as f:
+            f.write(text)
+        return self.path(name)
+
+    def test_read_csv_infers_types(self):
+        path = self._write("a.csv", "name,age,zip,ok,note\nAlice,30,00123,true,\nBob,24,10100,false,x\n")
+        ds = DataSet.read_csv(path)
+        self.assertEqual(ds[0], {"name": "Alice", "age": 30, "zip": "00123", "ok": True, "note": None})
+
+    def test_read_csv_with_schema_and_chunks(self):
+        path = self._write("a.csv", "name,age\nAlice,30\nBob,24\nCecilia,24\n")
+        chunks = list(DataSet.read_csv(path, chunksize=2, schema={"age": float}))
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual(chunks[0][0]["age"], 30.0)
+        with self.assertRaises(ValueError):
+            DataSet.read_csv(path, schema={"name": int})
+
+    def test_schema_object_with_undeclared_fields(self):
+        path = self._write("a.csv", "name,age,bonus\nAlice,30,\nBob,24,1.5\n")
+        ds = DataSet.read_csv(path, schema=Schema({"name": str, "age": float}))
+        self.assertEqual(ds.schema, Schema({"name": str, "age": float, "bonus": float}, nullable=["bonus"]))
+        self.assertEqual(dict(ds[0]), {"name": "Alice", "age": 30.0, "bonus": None})
+        with self.assertRaises(ValueError):
+            DataSet.read_csv(path, schema=Schema({"name": str, "age": float, "bonus": str}))
+
+    def test_short_csv_rows_have_missing_values(self):
+        path = self._write("a.csv", "name,age,city\nAlice,30\nBob\n")
+        self.assertEqual(list(DataSet.read_csv(path)), [{"name": "Alice", "age": 30, "city": None},
+                                                        {"name": "Bob", "age": None, "city": None}])
+        self.assertEqual(DataSet.read_csv(path, schema={"age": int})[1]["age"], None)
+
+    def test_long_csv_rows_are_rejected(self):
+        path = self._write("a.csv", "name,age\nAlice,30\nBob,24,Milan\n")
+        with self.assertRaisesRegex(ValueError, "Riga 3"):
+            DataSet.read_csv(path)
+
+    def test_read_jsonl(self):
+        path = self._write("a.jsonl", '{"a": 1}\n\n{"a": "2"}\n')
+        self.assertEqual(list(DataSet.read_jsonl(path, schema={"a": int})), [{"a": 1}, {"a": 2}])
+        path = self._write("b.jsonl", "[1]\n")
+        with self.assertRaises(ValueError):
+            DataSet.read_jsonl(path)
+
+    def test_scan_csv_is_lazy(self):
+        path = self._write("a.csv", "name,age\nAlice,30\nBob,24\n")
+        plan = DataSet.scan_csv(path).filter(lambda r: r["age"] > 25)
+        self.assertEqual([r["name"] for r in plan.collect()], ["Alice"])
+
+
+if __name__ == "__main__":
+    unittest.main()
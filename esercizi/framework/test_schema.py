@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Test della validazione tramite Schema.
+
+Esecuzione:
+    python -m unittest test_schema -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, Schema
+from fram_fixtures import _SAMPLE, _SCHEMA, _sample
+
+
+class SchemaTests(unittest.TestCase):
+    def test_validate(self):
+        DataSet(_sample(), schema=_SCHEMA)
+        with self.assertRaises(TypeError):
+            DataSet([{"name": "X", "age": "30", "city": "R", "salary": 1.0}], schema=_SCHEMA)
+        with self.assertRaises(ValueError):
+            DataSet([{"name": "X", "age": 30, "city": "R"}], schema=_SCHEMA)
+        with self.assertRaises(ValueError):
+            DataSet([{**_SAMPLE[0], "extra": 1}], schema=_SCHEMA)
+
+    def test_nullable_and_infer(self):
+        schema = Schema({"a": int, "b": float}, nullable=["b"])
+        DataSet([{"a": 1, "b": None}, {"a": 2}], schema=schema)
+        inferred = Schema.infer([{"a": 1, "b": 1}, {"a": 2, "b": 2.5}, {"a": 3}])
+        self.assertEqual(inferred, Schema({"a": int, "b": float}, nullable=["b"]))
+
+    def test_schema_is_inherited(self):
+        ds = DataSet(_sample(), schema=_SCHEMA)
+        self.assertIs(ds.filter(lambda r: True).schema, _SCHEMA)
+        self.assertEqual(ds.sum("salary"), 13100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
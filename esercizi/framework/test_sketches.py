@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Test degli sketch probabilistici (HyperLogLog, Count-Min).
+
+Esecuzione:
+    python -m unittest test_sketches -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, HyperLogLog, CountMinSketch
+from fram_fixtures import _sample
+
+
+class SketchTests(unittest.TestCase):
+    def test_hll_distinct(self):
+        ds = DataSet([{"v": i % 500} for i in range(5000)])
+        self.assertLess(abs(ds.approx_distinct("v") - 500), 50)
+
+    def test_kll_quantiles(self):
+        ds = DataSet([{"v": float(i)} for i in range(10_000)])
+        q = ds.approx_quantiles("v", [0.5])[0]
+        self.assertLess(abs(q - 5000), 300)
+
+    def test_cms_top_and_merge(self):
+        ds = DataSet([{"c": c} for c in "aaaaabbbc" * 10])
+        self.assertEqual(ds.approx_top_items("c", 2)[0][0], "a")
+        a, b = CountMinSketch(), CountMinSketch()
+        a.add("x", 3)
+        b.add("x", 2)
+        self.assertEqual(a.merge(b).estimate("x"), 5)
+        h1, h2 = HyperLogLog(), HyperLogLog()
+        for i in range(100):
+            (h1 if i % 2 else h2).add(i)
+        self.assertLess(abs(h1.merge(h2).count() - 100), 10)
+
+    def test_equal_numbers_hash_alike(self):
+        ds = DataSet([{"v": v} for v in [1, 1.0, True, 2, 2.5, 0, -0.0, False]])
+        self.assertEqual(ds.approx_distinct("v"), 4)  # 1, 2, 2.5, 0
+        cms = CountMinSketch()
+        for v in (1, 1.0, True):
+            cms.add(v)
+        self.assertEqual(cms.estimate(1), 3)
+
+    def test_unknown_sketch(self):
+        with self.assertRaises(ValueError):
+            DataSet(_sample()).sketch("age", "bloom")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+Test di ordinamento e top-k.
+
+Esecuzione:
+    python -m unittest test_sort -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet
+from fram_fixtures import _sample
+
+
+class SortTests(unittest.TestCase):
+    def test_sort_by_stable_with_directions(self):
+        ds = DataSet(_sample())
+        names = [r["name"] for r in ds.sort_by("age", "salary", descending=[False, True])]
+        self.assertEqual(names, ["Cecilia", "Bob", "Alice", "Diego"])
+
+    def test_top_and_bottom_k(self):
+        ds = DataSet(_sample())
+        self.assertEqual([r["name"] for r in ds.top_k("salary", 2)], ["Diego", "Alice"])
+        self.assertEqual([r["name"] for r in ds.bottom_k("salary", 1)], ["Bob"])
+
+    def test_external_sort_matches_in_memory(self):
+        ds = DataSet([{"v": (i * 7919) % 101, "i": i} for i in range(300)])
+        external = ds.lazy().sort_by("v", "i", run_size=32).collect()
+        self.assertEqual(list(external), list(ds.sort_by("v", "i")))
+
+
+if __name__ == "__main__":
+    unittest.main()
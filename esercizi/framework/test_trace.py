@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Test dell'istrumentazione (trace).
+
+Esecuzione:
+    python -m unittest test_trace -v
+"""
+
+import os
+import threading
+import unittest
+
+from soluzioneFram import DataSet, trace
+from fram_fixtures import _sample, _TempDirMixin
+
+
+class TraceTests(_TempDirMixin, unittest.TestCase):
+    def test_records_nested_operations(self):
+        ds = DataSet(_sample())
+        with trace() as t:
+            ds.filter(lambda r: r["age"] > 20).group_by("city").agg(n="count")
+        names = [e.name for e in t.events]
+        self.assertIn("DataSet.filter", names)
+        self.assertIn("GroupBy.agg", names)
+        event = next(e for e in t.events if e.name == "DataSet.filter")
+        self.assertEqual((event.rows_in, event.rows_out), (4, 4))
+        self.assertIn("DataSet.filter", t.table())
+
+    def test_chrome_trace_and_memory(self):
+        with trace(memory=True) as t:
+            DataSet(_sample()).sum("salary")
+        self.assertIsNotNone(t.events[0].bytes)
+        t.to_chrome_trace(self.path("trace.json"))
+        self.assertTrue(os.path.getsize(self.path("trace.json")) > 0)
+
+    def test_nested_operation_keeps_outer_peak(self):
+        inner = DataSet(_sample())
+
+        def transform(r):
+            if r["name"] == "Alice":
+                bytearray(4_000_000)  # picco dell'operazione esterna, liberato subito
+                inner.sum("salary")  # operazione annidata: azzera il picco di tracemalloc
+            return r
+        with trace(memory=True) as t:
+            DataSet(_sample()).map(transform)
+        outer = next(e for e in t.events if e.name == "DataSet.map")
+        nested = next(e for e in t.events if e.name == "DataSet.sum")
+        self.assertGreaterEqual(outer.bytes, 4_000_000)
+        self.assertLess(nested.bytes, 4_000_000)
+        self.assertEqual((outer.depth, nested.depth), (0, 1))
+
+    def test_threads_have_separate_stacks(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def transform(r):
+            if r["name"] == "Alice":
+                barrier.wait()  # entrambi i thread sono dentro map()
+            return r
+
+        def work():
+            DataSet(_sample()).map(transform)
+        with trace() as t:
+            threads = [threading.Thread(target=work) for _ in range(2)]
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join()
+        maps = [e for e in t.events if e.name == "DataSet.map"]
+        self.assertEqual([e.depth for e in maps], [0, 0])
+        self.assertEqual(len({e.thread for e in maps}), 2)
+
+    def test_no_events_outside_block(self):
+        with trace() as t:
+            pass
+        DataSet(_sample()).sum("salary")
+        self.assertEqual(t.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
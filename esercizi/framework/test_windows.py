@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Test delle funzioni finestra.
+
+Esecuzione:
+    python -m unittest test_windows -v
+"""
+
+import unittest
+
+from soluzioneFram import DataSet, ColumnarDataSet
+from fram_fixtures import _sample
+
+
+class WindowTests(unittest.TestCase):
+    def test_rolling_and_cumulative(self):
+        ds = DataSet([{"v": float(v)} for v in [1, 2, 3, 4]])
+        self.assertEqual([r["v_rolling_mean"] for r in ds.rolling("v", 2)], [None, 1.5, 2.5, 3.5])
+        self.assertEqual([r["v_cum_sum"] for r in ds.cumulative("v")], [1.0, 3.0, 6.0, 10.0])
+
+    def test_partition_and_order_keep_original_order(self):
+        ds = DataSet(_sample())
+        out = ds.cumulative("salary", "max", partition_by="city", order_by="age", name="m")
+        self.assertEqual([r["m"] for r in out], [3200.0, 2800.0, 3000.0, 4100.0])
+        self.assertEqual([r["m"] for r in ColumnarDataSet(_sample()).cumulative(
+            "salary", "max", partition_by="city", order_by="age", name="m")], [3200.0, 2800.0, 3000.0, 4100.0])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            DataSet(_sample()).rolling("age", 0)
+        with self.assertRaises(ValueError):
+            DataSet(_sample()).rolling("age", 2, "median")
+        for min_periods in (0, 3):
+            with self.assertRaises(ValueError):
+                DataSet(_sample()).rolling("age", 2, min_periods=min_periods)
+        self.assertEqual([r["age_rolling_sum"] for r in DataSet(_sample()).rolling("age", 2, "sum", min_periods=1)],
+                         [30.0, 54.0, 48.0, 65.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,8 +27,17 @@ hr-report/
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Callable, Tuple, Optional
 
 import numpy as np
 import pandas as pd
@@ -40,16 +49,150 @@ DATA_DIR = Path("data")
 OUT_DIR = Path("output")
 OUT_XLSX = OUT_DIR / "hr_summary.xlsx"
 OUT_OUTLIERS = OUT_DIR / "hr_outliers.csv"
+CACHE_DIR = OUT_DIR / ".cache"
+
+
+# =========================
+# Schema dei CSV (caricamento a blocchi)
+# =========================
+# Tipi di lettura espliciti: niente inferenza per blocco. Dopo il caricamento gli id interi
+# vengono ridotti al tipo più piccolo sufficiente e department/role sono category; i float
+# (rating, goals_met, valori monetari) restano float64: in float32 3.7 diventerebbe
+# 3.700000047..., e con esso medie, soglie IQR e ranking.
+EMP_DTYPES = {"employee_id": "int64", "first_name": "string", "last_name": "string",
+              "department": "category", "role": "category"}
+SAL_DTYPES = {"employee_id": "int64", "base_salary": "float64", "bonus": "float64"}
+PERF_DTYPES = {"employee_id": "int64", "year": "int64", "rating": "float64", "goals_met": "float64"}
+EMP_PARSE_DATES = ["hire_date"]
+DOWNCAST_INT = ("employee_id", "year")
 
 
 # =========================
 # Funzioni di caricamento
 # =========================
+def _concat_chunks(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatena i blocchi mantenendo le colonne category (stesse categorie in ogni blocco)."""
+    for col in parts[0].columns:
+        if isinstance(parts[0][col].dtype, pd.CategoricalDtype):
+            cats = pd.api.types.union_categoricals([p[col] for p in parts]).categories
+            for p in parts:
+                p[col] = p[col].cat.set_categories(cats)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    for col in DOWNCAST_INT:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def _read_csv_chunked(
+    path: Path,
+    dtypes: dict,
+    chunksize: int,
+    parse_dates: Optional[list[str]] = None,
+    year: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Legge un CSV a blocchi di chunksize righe con sole le colonne e i tipi di `dtypes`
+    (più parse_dates); se year è dato, ogni blocco viene filtrato prima di essere tenuto.
+    In memoria restano solo le righe selezionate più un blocco.
+    """
+    usecols = list(dtypes) + list(parse_dates or [])
+    reader = pd.read_csv(path, usecols=usecols, dtype=dtypes, parse_dates=parse_dates, chunksize=chunksize)
+    parts = []
+    for chunk in reader:
+        if year is not None:
+            chunk = chunk[chunk["year"] == year]
+        parts.append(chunk)
+    if not parts:  # file vuoto: solo intestazione
+        return pd.read_csv(path, usecols=usecols, dtype=dtypes, parse_dates=parse_dates, nrows=0)
+    return _downcast(_concat_chunks(parts))
+
+
+# =========================
+# Cache su disco dei CSV letti
+# =========================
+def _cache_format() -> str:
+    """'parquet' se è disponibile un motore (pyarrow/fastparquet), altrimenti 'pickle'."""
+    for engine in ("pyarrow", "fastparquet"):
+        if importlib.util.find_spec(engine) is not None:
+            return "parquet"
+    return "pickle"
+
+
+# mtime così vicini al momento dell'hash non distinguono una modifica successiva
+# (risoluzione del filesystem, scritture nello stesso istante): l'hash va ricalcolato
+RACY_MTIME_NS = 2_000_000_000
+
+
+def _file_digest(path: Path, cache_dir: Path) -> str:
+    """
+    blake2b del contenuto del file. Il digest viene memorizzato in cache_dir/index.json
+    insieme a dimensione e mtime: finché questi non cambiano il file non viene riletto.
+
+    Se il file era stato modificato meno di RACY_MTIME_NS prima dell'hash, una nuova
+    scrittura della stessa dimensione potrebbe lasciare invariato l'mtime: in quel caso
+    il file viene sempre riletto. Resta non rilevata una modifica che ripristini
+    esplicitamente dimensione e mtime (es. os.utime): usare --no-cache.
+    """
+    index_path = cache_dir / "index.json"
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+    st = path.stat()
+    key = str(path.resolve())
+    entry = index.get(key)
+    if (entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+            and entry.get("hashed_ns", 0) - st.st_mtime_ns > RACY_MTIME_NS):
+        return entry["digest"]
+    hashed_ns = time.time_ns()
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hashed_ns": hashed_ns,
+                  "digest": h.hexdigest()}
+    index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    return h.hexdigest()
+
+
+def _cached_read(path: Path, params: dict, reader: Callable[[], pd.DataFrame], cache_dir: Path) -> pd.DataFrame:
+    """
+    DataFrame letto da `reader`, salvato in cache_dir con chiave (nome file, hash dei
+    parametri di lettura, hash del contenuto). `params` descrive tutto ciò che cambia il
+    risultato (dtype, parse_dates, anno, ...): con parametri diversi la cache non viene
+    riusata. Parquet se disponibile, altrimenti pickle: entrambi conservano date e
+    category, quindi un hit non richiede alcun parsing.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fmt = _cache_format()
+    suffix = ".parquet" if fmt == "parquet" else ".pkl"
+    variant = hashlib.blake2b(json.dumps(params, sort_keys=True).encode("utf-8"), digest_size=6).hexdigest()
+    prefix = f"{path.stem}-{variant}-"
+    target = cache_dir / f"{prefix}{_file_digest(path, cache_dir)}{suffix}"
+    if target.exists():
+        print(f"[CACHE] hit:  {path.name} ({target.name})")
+        return pd.read_parquet(target) if fmt == "parquet" else pd.read_pickle(target)
+    print(f"[CACHE] miss: {path.name}")
+    df = reader()
+    for stale in cache_dir.glob(f"{prefix}*{suffix}"):  # versioni precedenti dello stesso file e parametri
+        stale.unlink()
+    tmp = target.with_name(target.name + ".tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp)
+    else:
+        df.to_pickle(tmp)
+    tmp.replace(target)  # rename atomico: una run interrotta non lascia file a metà
+    return df
+
+
 def load_data(
     employees_csv: Path,
     salaries_csv: Path,
     performance_csv: Path,
     performance_year: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Carica i 3 CSV in DataFrame pandas.
@@ -61,13 +204,48 @@ def load_data(
     - performance.csv -> columns: employee_id, year, rating, goals_met
     - se performance_year è fornito, filtra df_perf su quell'anno
 
+    Con chunksize i CSV vengono letti a blocchi (vedi _read_csv_chunked): il filtro
+    sull'anno avviene durante la lettura, department/role diventano category e gli
+    id interi vengono ridotti di tipo. Utile per export HR molto grandi.
+
+    Con cache_dir ogni DataFrame letto viene salvato in formato binario e riusato
+    finché il contenuto del CSV non cambia (vedi _cached_read).
+
     Ritorna: (df_emp, df_sal, df_perf)
     """
-    df_emp = pd.read_csv(employees_csv, parse_dates=["hire_date"])
-    df_sal = pd.read_csv(salaries_csv)
-    df_perf = pd.read_csv(performance_csv)
-    if performance_year is not None:
-        df_perf = df_perf[df_perf["year"] == performance_year].copy()
+    if chunksize is not None and chunksize <= 0:
+        raise ValueError("chunksize deve essere positivo")
+
+    def read_emp() -> pd.DataFrame:
+        if chunksize is not None:
+            return _read_csv_chunked(employees_csv, EMP_DTYPES, chunksize, parse_dates=EMP_PARSE_DATES)
+        return pd.read_csv(employees_csv, parse_dates=EMP_PARSE_DATES)
+
+    def read_sal() -> pd.DataFrame:
+        if chunksize is not None:
+            return _read_csv_chunked(salaries_csv, SAL_DTYPES, chunksize)
+        return pd.read_csv(salaries_csv)
+
+    def read_perf() -> pd.DataFrame:
+        if chunksize is not None:
+            return _read_csv_chunked(performance_csv, PERF_DTYPES, chunksize, year=performance_year)
+        df = pd.read_csv(performance_csv)
+        if performance_year is not None:
+            df = df[df["year"] == performance_year].copy()
+        return df
+
+    if cache_dir is None:
+        return read_emp(), read_sal(), read_perf()
+    chunked = chunksize is not None
+
+    def read_params(dtypes: dict, **extra) -> dict:
+        # tutto ciò che cambia il DataFrame letto entra nella chiave della cache
+        return {"chunked": chunked, "dtypes": dtypes if chunked else None,
+                "downcast": list(DOWNCAST_INT) if chunked else None, **extra}
+
+    df_emp = _cached_read(employees_csv, read_params(EMP_DTYPES, parse_dates=EMP_PARSE_DATES), read_emp, cache_dir)
+    df_sal = _cached_read(salaries_csv, read_params(SAL_DTYPES), read_sal, cache_dir)
+    df_perf = _cached_read(performance_csv, read_params(PERF_DTYPES, year=performance_year), read_perf, cache_dir)
     return df_emp, df_sal, df_perf
 
 
@@ -158,14 +336,78 @@ def _min_max_norm_by_group(s: pd.Series, g: pd.Series) -> pd.Series:
     """
     Supporto (già implementata): normalizzazione min-max per gruppo (department).
     valore_norm = (val - min_g) / (max_g - min_g), con gestione divisione per zero.
+
+    Come department_stage: min e max da un solo groupby, riportati sulle righe con un
+    reindex sulla chiave, invece di due groupby/transform.
     """
-    grp_min = s.groupby(g).transform("min")
-    grp_max = s.groupby(g).transform("max")
+    bounds = s.groupby(g, observed=True).agg(["min", "max"])
+    per_row = bounds.reindex(g).set_axis(s.index)
+    return _min_max_norm_aligned(s, per_row["min"], per_row["max"])
+
+
+def _min_max_norm_aligned(s: pd.Series, grp_min: pd.Series, grp_max: pd.Series) -> pd.Series:
+    """Normalizzazione min-max con min/max del gruppo già allineati alle righe di s."""
     denom = (grp_max - grp_min).replace(0, np.nan)
     norm = (s - grp_min) / denom
     return norm.fillna(0.0)
 
 
+# =========================
+# Statistiche per reparto (un solo groupby)
+# =========================
+def department_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tutte le statistiche per department usate da outlier e ranking, da un solo groupby:
+    emp_count, medie, min/max di rating e goals_met, Q1/Q3 di total_comp.
+    Una riga per reparto (indice: department).
+    """
+    g = df.groupby("department", observed=True, sort=True)
+    stats = g.agg(
+        emp_count=("employee_id", "count"),
+        total_comp_mean=("total_comp", "mean"),
+        rating_mean=("rating", "mean"),
+        rating_min=("rating", "min"),
+        rating_max=("rating", "max"),
+        goals_min=("goals_met", "min"),
+        goals_max=("goals_met", "max"),
+    )
+    q = g["total_comp"].quantile([0.25, 0.75]).unstack()  # stesso grouper: niente nuova fattorizzazione
+    stats["total_comp_q1"] = q[0.25]
+    stats["total_comp_q3"] = q[0.75]
+    return stats
+
+
+def _top_performers(ranked: pd.DataFrame, top_n: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    by_dept = ranked.sort_values(["department", "perf_score"], ascending=[True, False], kind="stable")
+    top_by_dept = by_dept.groupby("department", observed=True, sort=False).head(top_n)
+    top_global = ranked.sort_values("perf_score", ascending=False, kind="stable").head(top_n)
+    return top_by_dept, top_global
+
+
+def department_stage(
+    df: pd.DataFrame, stats: Optional[pd.DataFrame] = None, top_n: int = 10
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    detect_outliers_iqr + build_rankings a partire da department_stats: le statistiche
+    vengono riportate sulle righe con un solo allineamento (reindex sul department)
+    invece di un groupby/transform per ogni min, max e quantile.
+
+    Ritorna: (df con is_comp_outlier, top_performers_by_dept, top_performers_global)
+    """
+    stats = department_stats(df) if stats is None else stats
+    per_row = stats.reindex(df["department"]).set_axis(df.index)
+    q1, q3 = per_row["total_comp_q1"], per_row["total_comp_q3"]
+    iqr = q3 - q1
+    result = df.copy()
+    result["is_comp_outlier"] = (df["total_comp"] < q1 - 1.5 * iqr) | (df["total_comp"] > q3 + 1.5 * iqr)
+    ranked = result.copy()
+    ranked["rating_norm"] = _min_max_norm_aligned(df["rating"], per_row["rating_min"], per_row["rating_max"])
+    ranked["goals_norm"] = _min_max_norm_aligned(df["goals_met"], per_row["goals_min"], per_row["goals_max"])
+    ranked["perf_score"] = 0.7 * ranked["rating_norm"] + 0.3 * ranked["goals_norm"]
+    top_by_dept, top_global = _top_performers(ranked, top_n)
+    return result, top_by_dept, top_global
+
+
 def build_rankings(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Costruisci ranking per reparto e globale.
@@ -182,6 +424,139 @@ def build_rankings(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     pass
 
 
+# =========================
+# Outlier e ranking in parallelo per reparto
+# =========================
+# Colonne numeriche condivise con i worker (righe ordinate per reparto) e, per ogni
+# reparto, le colonne di department_stats che i worker restituiscono, nello stesso ordine
+_DEPT_INPUTS = ("employee_id", "total_comp", "rating", "goals_met")
+_DEPT_STATS = ("emp_count", "total_comp_mean", "rating_mean", "rating_min", "rating_max",
+               "goals_min", "goals_max", "total_comp_q1", "total_comp_q3")
+
+
+def _dept_stats_block(data: np.ndarray, bounds: list[tuple[int, int]]) -> np.ndarray:
+    """Righe di department_stats (colonne _DEPT_STATS) per i reparti data[:, start:end]."""
+    out = np.empty((len(bounds), len(_DEPT_STATS)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # colonna tutta NaN in un reparto -> NaN, come pandas
+        for i, (start, end) in enumerate(bounds):
+            ids, comp, rating, goals = data[:, start:end]
+            q1, q3 = np.nanquantile(comp, [0.25, 0.75])
+            out[i] = (np.count_nonzero(~np.isnan(ids)), np.nanmean(comp), np.nanmean(rating),
+                      np.nanmin(rating), np.nanmax(rating), np.nanmin(goals), np.nanmax(goals), q1, q3)
+    return out
+
+
+def _dept_worker(in_name: str, n: int, bounds: list[tuple[int, int]]) -> np.ndarray:
+    # i dati arrivano tramite shared memory: al worker si passano solo nome e intervalli,
+    # indietro torna una riga di statistiche per reparto
+    shm_in = SharedMemory(name=in_name)
+    try:
+        data = np.ndarray((len(_DEPT_INPUTS), n), dtype=np.float64, buffer=shm_in.buf)
+        stats = _dept_stats_block(data, bounds)
+        del data  # la view va rilasciata prima di close()
+        return stats
+    finally:
+        shm_in.close()
+
+
+def _dept_batches(bounds: list[tuple[int, int]], n_batches: int) -> list[list[tuple[int, int]]]:
+    """Reparti contigui raggruppati in n_batches blocchi con circa lo stesso numero di righe."""
+    total = sum(end - start for start, end in bounds)
+    target = max(1, total // max(1, n_batches))
+    batches, current, size = [], [], 0
+    for b in bounds:
+        current.append(b)
+        size += b[1] - b[0]
+        if size >= target:
+            batches.append(current)
+            current, size = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def department_stats_parallel(df: pd.DataFrame, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    department_stats calcolato per reparto su un process pool.
+
+    Le righe vengono ordinate per department; employee_id/total_comp/rating/goals_met
+    vengono copiati una volta in un blocco di shared memory e ogni worker restituisce
+    le statistiche dei suoi reparti (una riga ciascuno). Il risultato non dipende dal
+    numero di worker né dall'ordine di completamento.
+    """
+    n = len(df)
+    codes, uniques = pd.factorize(df["department"], sort=True)  # NaN -> -1: nessun reparto
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-2))
+    bounds = [(int(a), int(b)) for a, b in zip(starts, list(starts[1:]) + [n]) if sorted_codes[a] >= 0]
+
+    data = np.vstack([df[c].to_numpy(dtype=np.float64, na_value=np.nan)[order] for c in _DEPT_INPUTS]) \
+        if n else np.empty((len(_DEPT_INPUTS), 0))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(bounds) <= 1:
+        values = _dept_stats_block(data, bounds)
+    else:
+        shm_in = SharedMemory(create=True, size=max(1, data.nbytes))
+        try:
+            np.ndarray(data.shape, dtype=np.float64, buffer=shm_in.buf)[:] = data
+            batches = _dept_batches(bounds, workers * 4)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_dept_worker, shm_in.name, n, b) for b in batches]
+                values = np.vstack([f.result() for f in futures])
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+
+    index = pd.Index(uniques.take([sorted_codes[a] for a, _ in bounds]), name="department")
+    stats = pd.DataFrame(values, index=index, columns=list(_DEPT_STATS))
+    stats["emp_count"] = stats["emp_count"].astype("int64")
+    for col, source in (("rating_min", "rating"), ("rating_max", "rating"),
+                        ("goals_min", "goals_met"), ("goals_max", "goals_met")):
+        if pd.api.types.is_integer_dtype(df[source]):  # min/max di interi restano interi, come in pandas
+            stats[col] = stats[col].astype(df[source].dtype)
+    return stats
+
+
+def detect_outliers_and_rank_parallel(
+    df: pd.DataFrame, workers: Optional[int] = None, top_n: int = 10
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    detect_outliers_iqr + build_rankings con le statistiche per reparto calcolate in
+    parallelo (department_stats_parallel); outlier e punteggi vengono poi ricavati da
+    department_stage, come nel percorso con un solo groupby.
+
+    Ritorna: (df con is_comp_outlier, top_performers_by_dept, top_performers_global)
+    """
+    return department_stage(df, department_stats_parallel(df, workers), top_n)
+
+
+def _check_dept_options(dept_workers: int, fused_stats: bool) -> None:
+    if dept_workers > 1 and fused_stats:
+        raise ValueError("dept_workers > 1 e fused_stats sono alternativi: scegline uno")
+
+
+def outliers_and_rankings(
+    df: pd.DataFrame, dept_workers: int = 1, fused_stats: bool = False
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Stadio outlier + ranking scelto dalle opzioni della pipeline:
+    dept_workers > 1 -> detect_outliers_and_rank_parallel, fused_stats -> department_stage,
+    altrimenti detect_outliers_iqr + build_rankings.
+
+    Ritorna: (df con is_comp_outlier, top_performers_by_dept, top_performers_global)
+    """
+    _check_dept_options(dept_workers, fused_stats)
+    if dept_workers > 1:
+        return detect_outliers_and_rank_parallel(df, workers=dept_workers)
+    if fused_stats:
+        return department_stage(df)
+    df = detect_outliers_iqr(df)
+    top_by_dept, top_global = build_rankings(df)
+    return df, top_by_dept, top_global
+
+
 def export_report(
     df: pd.DataFrame,
     agg_role_dept: pd.DataFrame,
@@ -211,27 +586,150 @@ def run_pipeline(
     employees_csv: Path = DATA_DIR / "employees.csv",
     salaries_csv: Path = DATA_DIR / "salaries.csv",
     performance_csv: Path = DATA_DIR / "performance.csv",
+    chunksize: Optional[int] = None,
+    use_cache: bool = True,
+    dept_workers: int = 1,
+    fused_stats: bool = False,
 ) -> None:
     """
     Esegue l'intera pipeline: load -> merge -> clean -> aggregate -> outliers -> ranking -> export
     Scrive in output/:
       - hr_summary.xlsx
       - hr_outliers.csv
+    Con dept_workers > 1 outlier e ranking girano per reparto in parallelo
+    (detect_outliers_and_rank_parallel); con fused_stats usano department_stage,
+    che calcola le statistiche per reparto con un solo groupby. Le due opzioni
+    sono alternative (ValueError se richieste insieme).
     """
+    _check_dept_options(dept_workers, fused_stats)
     OUT_DIR.mkdir(exist_ok=True, parents=True)
     df_emp, df_sal, df_perf = load_data(
-        employees_csv, salaries_csv, performance_csv, performance_year=year
+        employees_csv, salaries_csv, performance_csv, performance_year=year, chunksize=chunksize,
+        cache_dir=CACHE_DIR if use_cache else None,
     )
     df = merge_data(df_emp, df_sal, df_perf)
     df = clean_data(df)
     agg = aggregate_by_dept_role(df)
-    df = detect_outliers_iqr(df)
-    top_by_dept, top_global = build_rankings(df)
+    df, top_by_dept, top_global = outliers_and_rankings(df, dept_workers, fused_stats)
     export_report(df, agg, top_by_dept, top_global, OUT_XLSX, OUT_OUTLIERS)
     print(f"[OK] Report salvato in: {OUT_XLSX}")
     print(f"[OK] Outlier CSV:       {OUT_OUTLIERS}")
 
 
+# =========================
+# Modalità batch (più anni)
+# =========================
+def _parse_years(spec: str) -> list[int]:
+    """'2019-2024' -> [2019, ..., 2024]; '2019,2021,2023' -> [2019, 2021, 2023]."""
+    years: list[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+            if start > end:
+                raise ValueError(f"Intervallo di anni non valido: {part}")
+            years.extend(range(start, end + 1))
+        elif part:
+            years.append(int(part))
+    if not years:
+        raise ValueError("Specificare almeno un anno")
+    return sorted(set(years))
+
+
+def _merge_static(df_emp: pd.DataFrame, df_sal: pd.DataFrame) -> pd.DataFrame:
+    """employees + salaries con le stesse regole di merge_data (bonus NaN -> 0, total_comp)."""
+    df = df_emp.merge(df_sal, on="employee_id", how="left")
+    df["bonus"] = df["bonus"].fillna(0)
+    df["total_comp"] = df["base_salary"] + df["bonus"]
+    return df
+
+
+def _run_year(df_year: pd.DataFrame, dept_workers: int = 1, fused_stats: bool = False) -> dict:
+    """Stadi per-anno (clean -> aggregate -> outliers -> ranking); a livello di modulo per il process pool."""
+    df = clean_data(df_year)
+    agg = aggregate_by_dept_role(df)
+    df, top_by_dept, top_global = outliers_and_rankings(df, dept_workers, fused_stats)
+    return {"df": df, "agg": agg, "top_by_dept": top_by_dept, "top_global": top_global}
+
+
+def _export_batch_workbook(results: dict, out_xlsx: Path, out_outliers_csv: Path) -> None:
+    """Un solo workbook: KPI con una riga per anno e fogli Aggregati/TopByDept/TopGlobal per anno."""
+    kpi = pd.DataFrame([
+        {"year": year, "n_employees": r["df"]["employee_id"].nunique(),
+         "mean_total_comp": r["df"]["total_comp"].mean(), "mean_rating": r["df"]["rating"].mean()}
+        for year, r in results.items()
+    ])
+    with pd.ExcelWriter(out_xlsx) as w:
+        kpi.to_excel(w, sheet_name="KPI", index=False)
+        for year, r in results.items():
+            r["agg"].to_excel(w, sheet_name=f"Aggregati_{year}")
+            r["top_by_dept"].to_excel(w, sheet_name=f"TopByDept_{year}", index=False)
+            r["top_global"].to_excel(w, sheet_name=f"TopGlobal_{year}", index=False)
+    outliers = [r["df"][r["df"]["is_comp_outlier"]].assign(year=year) for year, r in results.items()]
+    pd.concat(outliers, ignore_index=True).to_csv(out_outliers_csv, index=False)
+
+
+def run_pipeline_batch(
+    years: list[int],
+    employees_csv: Path = DATA_DIR / "employees.csv",
+    salaries_csv: Path = DATA_DIR / "salaries.csv",
+    performance_csv: Path = DATA_DIR / "performance.csv",
+    chunksize: Optional[int] = None,
+    use_cache: bool = True,
+    workers: int = 1,
+    single_workbook: bool = False,
+    dept_workers: int = 1,
+    fused_stats: bool = False,
+) -> dict:
+    """
+    Pipeline su più anni di performance con un solo caricamento:
+    - employees e salaries vengono letti e uniti una volta sola
+    - performance viene letto per intero e partizionato per anno
+    - clean/aggregate/outliers/ranking girano per anno (in un process pool se workers > 1),
+      con lo stadio outlier/ranking scelto da dept_workers/fused_stats come in run_pipeline
+
+    workers > 1 e dept_workers > 1 insieme annidarebbero due process pool: ValueError.
+
+    Scrive hr_summary_<anno>.xlsx e hr_outliers_<anno>.csv per ogni anno, oppure con
+    single_workbook=True un solo hr_summary.xlsx con fogli per anno e un solo CSV di outlier.
+    Gli anni senza dati di performance vengono saltati. Ritorna {anno: risultati}.
+    """
+    _check_dept_options(dept_workers, fused_stats)
+    if workers > 1 and dept_workers > 1:
+        raise ValueError("workers > 1 e dept_workers > 1 sono alternativi: parallelizza per anno o per reparto")
+    OUT_DIR.mkdir(exist_ok=True, parents=True)
+    df_emp, df_sal, df_perf = load_data(
+        employees_csv, salaries_csv, performance_csv, performance_year=None, chunksize=chunksize,
+        cache_dir=CACHE_DIR if use_cache else None,
+    )
+    df_static = _merge_static(df_emp, df_sal)
+    wanted = set(years)
+    perf_by_year = {int(y): part for y, part in df_perf.groupby("year", sort=True) if int(y) in wanted}
+    for year in sorted(wanted - perf_by_year.keys()):
+        print(f"[WARN] Nessun dato di performance per il {year}: anno saltato")
+    ordered = sorted(perf_by_year)
+    frames = [df_static.merge(perf_by_year[y], on="employee_id", how="left") for y in ordered]
+
+    run_year = functools.partial(_run_year, dept_workers=dept_workers, fused_stats=fused_stats)
+    if workers > 1 and len(frames) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(run_year, frames))
+    else:
+        outputs = [run_year(f) for f in frames]
+    results = dict(zip(ordered, outputs))
+
+    if single_workbook:
+        _export_batch_workbook(results, OUT_XLSX, OUT_OUTLIERS)
+        print(f"[OK] Report ({len(results)} anni) salvato in: {OUT_XLSX}")
+        return results
+    for year, r in results.items():
+        out_xlsx = OUT_DIR / f"hr_summary_{year}.xlsx"
+        out_outliers = OUT_DIR / f"hr_outliers_{year}.csv"
+        export_report(r["df"], r["agg"], r["top_by_dept"], r["top_global"], out_xlsx, out_outliers)
+        print(f"[OK] {year}: {out_xlsx}, {out_outliers}")
+    return results
+
+
 # =========================
 # TEST (unittest)
 # =========================
@@ -314,6 +812,148 @@ class HRReportTests(unittest.TestCase):
         top_by_dept, top_global = build_rankings(df)
         self.assertEqual(int(top_global.iloc[0]["employee_id"]), 104, "Con i sample, 104 deve essere primo")
 
+    def test_load_chunked(self):
+        multi_year = SAMPLE_PERF_2024 + "101,2023,3.9,6\n102,2023,2.8,4\n"
+        (self.data / "performance.csv").write_text(multi_year, encoding="utf-8")
+        df_emp, df_sal, df_perf = load_data(
+            self.data / "employees.csv",
+            self.data / "salaries.csv",
+            self.data / "performance.csv",
+            performance_year=2024,
+            chunksize=2,
+        )
+        self.assertEqual(len(df_emp), 4)
+        self.assertEqual(len(df_sal), 4)
+        self.assertEqual(sorted(df_perf["employee_id"]), [101, 102, 103, 104])
+        self.assertTrue((df_perf["year"] == 2024).all())
+        self.assertIsInstance(df_emp["department"].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_emp["hire_date"]))
+        # rating/goals_met restano float64: stessi valori della lettura non a blocchi
+        full = load_data(self.data / "employees.csv", self.data / "salaries.csv",
+                         self.data / "performance.csv", performance_year=2024)[2]
+        for col in ("rating", "goals_met"):
+            self.assertEqual(df_perf[col].dtype, "float64")
+            self.assertEqual(sorted(df_perf[col]), sorted(full[col].astype("float64")))
+
+    def test_load_cached(self):
+        paths = (self.data / "employees.csv", self.data / "salaries.csv", self.data / "performance.csv")
+        cache = self.tmpdir / "cache"
+        first = load_data(*paths, performance_year=2024, cache_dir=cache)
+        second = load_data(*paths, performance_year=2024, cache_dir=cache)
+        for a, b in zip(first, second):
+            pd.testing.assert_frame_equal(a, b)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(second[0]["hire_date"]))
+        # CSV modificato -> la cache non deve restituire i dati vecchi
+        (self.data / "salaries.csv").write_text(SAMPLE_SAL.replace("52000", "53000"), encoding="utf-8")
+        _, df_sal, _ = load_data(*paths, performance_year=2024, cache_dir=cache)
+        self.assertEqual(int(df_sal.loc[df_sal["employee_id"] == 101, "base_salary"].iloc[0]), 53000)
+
+    def test_cache_key_includes_read_params(self):
+        paths = (self.data / "employees.csv", self.data / "salaries.csv", self.data / "performance.csv")
+        cache = self.tmpdir / "cache"
+        first = load_data(*paths, performance_year=2024, chunksize=2, cache_dir=cache)[2]
+        self.assertEqual(first["rating"].dtype, "float64")
+        original = dict(PERF_DTYPES)
+        PERF_DTYPES["rating"] = "float32"
+        try:
+            changed = load_data(*paths, performance_year=2024, chunksize=2, cache_dir=cache)[2]
+        finally:
+            PERF_DTYPES.clear()
+            PERF_DTYPES.update(original)
+        self.assertEqual(changed["rating"].dtype, "float32")
+        other_year = load_data(*paths, performance_year=2023, chunksize=2, cache_dir=cache)[2]
+        self.assertEqual(len(other_year), 0)
+
+    def test_digest_rehashes_recent_mtime(self):
+        cache = self.tmpdir / "cache"
+        cache.mkdir()
+        path = self.data / "salaries.csv"
+        st = path.stat()
+        first = _file_digest(path, cache)
+        # stessa dimensione e stesso mtime: rilevata solo perché l'mtime era recente all'hash
+        path.write_text(SAMPLE_SAL.replace("52000", "53000"), encoding="utf-8")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        second = _file_digest(path, cache)
+        self.assertNotEqual(first, second)
+        # mtime ormai vecchio: il digest memorizzato viene riusato senza rileggere
+        old = st.st_mtime_ns - 10 * RACY_MTIME_NS
+        os.utime(path, ns=(old, old))
+        third = _file_digest(path, cache)
+        path.write_text(SAMPLE_SAL.replace("52000", "54000"), encoding="utf-8")
+        os.utime(path, ns=(old, old))
+        self.assertEqual(_file_digest(path, cache), third)
+
+    def test_parse_years(self):
+        self.assertEqual(_parse_years("2019-2021"), [2019, 2020, 2021])
+        self.assertEqual(_parse_years("2024,2019-2020"), [2019, 2020, 2024])
+        with self.assertRaises(ValueError):
+            _parse_years("2024-2019")
+
+    def test_department_parallel(self):
+        df = (pd.read_csv(self.data / "employees.csv")
+              .merge(pd.read_csv(self.data / "salaries.csv"), on="employee_id", how="left")
+              .merge(pd.read_csv(self.data / "performance.csv"), on="employee_id", how="left"))
+        df["total_comp"] = df["base_salary"] + df["bonus"]
+        seq, seq_dept, seq_global = detect_outliers_and_rank_parallel(df, workers=1)
+        par, par_dept, par_global = detect_outliers_and_rank_parallel(df, workers=2)
+        pd.testing.assert_frame_equal(seq, par)
+        pd.testing.assert_frame_equal(seq_dept, par_dept)
+        pd.testing.assert_frame_equal(seq_global, par_global)
+        self.assertEqual(int(par_global.iloc[0]["employee_id"]), 104)
+        expected = (0.7 * _min_max_norm_by_group(df["rating"], df["department"])
+                    + 0.3 * _min_max_norm_by_group(df["goals_met"], df["department"]))
+        self.assertTrue(np.allclose(par_global.sort_index()["perf_score"], expected.sort_index()))
+
+    def test_dept_options(self):
+        df = (pd.read_csv(self.data / "employees.csv")
+              .merge(pd.read_csv(self.data / "salaries.csv"), on="employee_id", how="left")
+              .merge(pd.read_csv(self.data / "performance.csv"), on="employee_id", how="left"))
+        df["total_comp"] = df["base_salary"] + df["bonus"]
+        fused = outliers_and_rankings(df, fused_stats=True)
+        par = outliers_and_rankings(df, dept_workers=2)
+        for a, b in zip(fused, par):
+            pd.testing.assert_frame_equal(a, b)
+        with self.assertRaises(ValueError):
+            outliers_and_rankings(df, dept_workers=2, fused_stats=True)
+        with self.assertRaises(ValueError):
+            run_pipeline(dept_workers=2, fused_stats=True)
+        with self.assertRaises(ValueError):
+            run_pipeline_batch([2024], workers=2, dept_workers=2)
+
+    def test_department_stats_parallel(self):
+        df = (pd.read_csv(self.data / "employees.csv")
+              .merge(pd.read_csv(self.data / "salaries.csv"), on="employee_id", how="left")
+              .merge(pd.read_csv(self.data / "performance.csv"), on="employee_id", how="left"))
+        df["total_comp"] = df["base_salary"] + df["bonus"]
+        df.loc[0, "rating"] = np.nan
+        expected = department_stats(df)
+        for workers in (1, 2):
+            pd.testing.assert_frame_equal(department_stats_parallel(df, workers=workers), expected)
+
+    def test_department_stage(self):
+        df = (pd.read_csv(self.data / "employees.csv")
+              .merge(pd.read_csv(self.data / "salaries.csv"), on="employee_id", how="left")
+              .merge(pd.read_csv(self.data / "performance.csv"), on="employee_id", how="left"))
+        df["total_comp"] = df["base_salary"] + df["bonus"]
+        stats = department_stats(df)
+        self.assertEqual(int(stats.loc["Engineering", "emp_count"]), 2)
+        self.assertEqual(float(stats.loc["Engineering", "rating_max"]), 4.8)
+        fused, fused_dept, fused_global = department_stage(df, stats)
+        par, par_dept, par_global = detect_outliers_and_rank_parallel(df, workers=1)
+        pd.testing.assert_series_equal(fused["is_comp_outlier"], par["is_comp_outlier"])
+        pd.testing.assert_frame_equal(fused_global, par_global)
+        pd.testing.assert_frame_equal(fused_dept, par_dept)
+
+    def test_min_max_norm_by_group(self):
+        s = pd.Series([1.0, 3.0, 2.0, 5.0, 5.0, 4.0], index=[10, 11, 12, 13, 14, 15])
+        for g in (pd.Series(list("aabccb"), index=s.index),
+                  pd.Series(list("aabccb"), index=s.index, dtype="category")):
+            expected = _min_max_norm_aligned(s, s.groupby(g, observed=True).transform("min"),
+                                             s.groupby(g, observed=True).transform("max"))
+            result = _min_max_norm_by_group(s, g)
+            pd.testing.assert_series_equal(result, expected)
+            self.assertEqual(result.tolist(), [0.0, 1.0, 0.0, 0.0, 0.0, 1.0])
+
     def test_export(self):
         out_xlsx = self.out / "hr_summary.xlsx"
         out_outliers = self.out / "hr_outliers.csv"
@@ -345,7 +985,27 @@ def _parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="HR Report (Pandas) — scheletro per studenti")
     p.add_argument("--test", action="store_true", help="Esegui i test unittari")
     p.add_argument("--year", type=int, default=2024, help="Anno performance (default: 2024)")
-    return p.parse_args()
+    p.add_argument("--years", type=str, default=None,
+                   help="Modalità batch su più anni, es. 2019-2024 oppure 2019,2021")
+    p.add_argument("--workers", type=int, default=1, help="Processi per la modalità batch (default: 1)")
+    p.add_argument("--dept-workers", type=int, default=1,
+                   help="Processi per outlier/ranking per reparto (default: 1, sequenziale)")
+    p.add_argument("--fused-stats", action="store_true",
+                   help="Outlier e ranking da un unico groupby per reparto (department_stage)")
+    p.add_argument("--single-workbook", action="store_true",
+                   help="In modalità batch: un solo workbook con fogli per anno")
+    p.add_argument("--chunksize", type=int, default=None,
+                   help="Leggi i CSV a blocchi di N righe (memoria limitata su file grandi)")
+    p.add_argument("--no-cache", action="store_true",
+                   help=f"Non usare la cache dei CSV letti ({CACHE_DIR})")
+    args = p.parse_args()
+    if args.dept_workers > 1 and args.fused_stats:
+        p.error("--dept-workers > 1 e --fused-stats sono alternativi")
+    if args.years is None and (args.workers > 1 or args.single_workbook):
+        p.error("--workers e --single-workbook valgono solo con --years")
+    if args.years is not None and args.workers > 1 and args.dept_workers > 1:
+        p.error("con --years usa --workers (per anno) oppure --dept-workers (per reparto), non entrambi")
+    return args
 
 
 if __name__ == "__main__":
@@ -360,4 +1020,10 @@ if __name__ == "__main__":
     else:
         # Esegui pipeline su cartelle di progetto (data/ -> output/)
         OUT_DIR.mkdir(exist_ok=True)
-        run_pipeline(year=args.year)
+        if args.years:
+            run_pipeline_batch(_parse_years(args.years), chunksize=args.chunksize, use_cache=not args.no_cache,
+                               workers=args.workers, single_workbook=args.single_workbook,
+                               dept_workers=args.dept_workers, fused_stats=args.fused_stats)
+        else:
+            run_pipeline(year=args.year, chunksize=args.chunksize, use_cache=not args.no_cache,
+                         dept_workers=args.dept_workers, fused_stats=args.fused_stats)